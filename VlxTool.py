@@ -3,6 +3,8 @@
 This file keeps backward-compatible entrypoint behavior. The heavy lifting
 is implemented in `app.app.App`.
 """
+import multiprocessing
+
 from app.app import App
 
 
@@ -21,4 +23,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the multi-process mesher in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
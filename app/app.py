@@ -96,6 +96,11 @@ class App:
         self.alt_pressed_last_frame = False
         self.hit_voxel_pos, self.place_voxel_pos, self.hit_voxel_normal = None, None, None
         self.current_filepath = None
+        # Background load and save in progress (FileJob), polled once per frame
+        self.load_job = None
+        self.save_job = None
+        # Path of a save requested while another one was still writing
+        self.queued_save = None
         # Pivot set mode: when True, the next left click will set world.pivot
         self.waiting_for_pivot = False
 
@@ -153,7 +158,10 @@ class App:
             self.process_input(delta_time)
             # perform raycast update via module
             raycast_mod.update_raycast(self)
+            self.poll_file_jobs()
             self.scene.world.update_dirty_chunks() #
+            # The world can be resized from the UI or by loading a larger model
+            self.camera.fit_world(self.scene.world.total_size)
             
             self.render_frame()
             
@@ -163,7 +171,7 @@ class App:
         mask = GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT  # type: ignore[arg-type]
         glClear(mask)
         view = self.camera.get_view_matrix() #
-        proj = pyrr.matrix44.create_perspective_projection(75, SCREEN_WIDTH/SCREEN_HEIGHT, 0.1, 1024, np.float32)
+        proj = pyrr.matrix44.create_perspective_projection(75, SCREEN_WIDTH/SCREEN_HEIGHT, 0.1, self.camera.far_plane, np.float32)
 
         # La clase Scene se encarga de toda la lógica de renderizado
         self.scene.render(proj, view, self.voxel_shader, self.hit_voxel_pos, self.hit_voxel_normal)
@@ -202,11 +210,36 @@ class App:
 
     # --- Funciones de la Aplicación para la UI ---
     def app_save_world(self):
-        if path := self.file_manager.save_world(): self.current_filepath = path
+        if path := self.file_manager.ask_save_path(): self.start_save(path)
     def app_load_world(self):
-        if path := self.file_manager.load_world(): self.current_filepath = path
+        if path := self.file_manager.ask_load_path(): self.start_load(path)
     def app_load_from_history(self, path):
-        if loaded_path := self.file_manager.load_world_from_path(path): self.current_filepath = loaded_path
+        self.start_load(path)
+    def app_cancel_load(self):
+        if self.load_job: self.load_job.cancel()
+
+    def start_load(self, path):
+        # Models load on a background thread; a new load replaces the one in progress
+        if self.load_job: self.load_job.cancel()
+        self.load_job = self.file_manager.start_load(path)
+
+    def start_save(self, path):
+        # Saves serialize a snapshot on a background thread; one requested meanwhile
+        # waits for the current one and then snapshots the latest state
+        if self.save_job: self.queued_save = path
+        else: self.save_job = self.file_manager.start_save(path)
+
+    def poll_file_jobs(self):
+        # The finished model is swapped in here, between two frames
+        if self.load_job and self.load_job.done:
+            job, self.load_job = self.load_job, None
+            if path := self.file_manager.finish_load(job): self.current_filepath = path
+        if self.save_job and self.save_job.done:
+            job, self.save_job = self.save_job, None
+            if path := self.file_manager.finish_save(job): self.current_filepath = path
+            if self.queued_save:
+                path, self.queued_save = self.queued_save, None
+                self.start_save(path)
     def app_clear_world(self):
         self.file_manager.clear_world(); self.current_filepath = None
 
@@ -214,6 +247,12 @@ class App:
         return io_mod.prompt_for_hpp_file()
 
     def quit(self):
+        if getattr(self, 'load_job', None):
+            self.load_job.cancel()
+        # A save in progress (and one queued behind it) is finished before exiting
+        while getattr(self, 'save_job', None):
+            self.save_job.wait()
+            self.poll_file_jobs()
         window_mod.destroy_shader(self)
         if hasattr(self, 'ui_manager'):
             try:
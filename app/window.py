@@ -1,7 +1,7 @@
 import os
 import sys
 import glfw
-from src.utils.Config import SCREEN_WIDTH, SCREEN_HEIGHT, create_shader_program
+from src.utils.Config import SCREEN_WIDTH, SCREEN_HEIGHT, VERTEX_FORMAT, create_shader_program
 from OpenGL.GL import (
     glClearColor,
     glEnable,
@@ -42,7 +42,9 @@ def initialize_opengl(app):
     glFrontFace(GL_CW)
 
     # Shader files are in the repository top-level `shaders/` directory
-    vert = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shaders", "voxel.vert")
+    # The packed vertex layout is decoded by its own vertex shader
+    vert_name = "voxel_packed.vert" if VERTEX_FORMAT == 'packed' else "voxel.vert"
+    vert = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shaders", vert_name)
     frag = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shaders", "voxel.frag")
     vert = os.path.normpath(vert)
     frag = os.path.normpath(frag)
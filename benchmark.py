@@ -0,0 +1,266 @@
+"""Headless performance benchmarks for VlxTool.
+
+Builds synthetic worlds (empty, full cube, checkerboard worst case, sphere,
+noise terrain) without a window or GL context (`World(headless=True)`) and
+times the hot paths: chunk meshing, raycasting, .vlx save/load and
+undo/redo through `ActionHistory`.
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.15
+
+With `--compare` every benchmark whose median is more than `threshold`
+slower than the baseline is flagged and the exit code is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from enum import IntEnum
+
+import numpy as np
+
+from src.core.World import World
+from src.core.Raycast import Raycast
+from src.managers.ActionHistory import ActionHistory
+from src.managers.FileManager import FileManager
+from src.managers.HistoryManager import HistoryManager
+
+BlockType = IntEnum('BlockType', {'Air': 0, 'Stone': 1, 'Dirt': 2, 'Grass': 3, 'Sand': 4})
+
+
+# --- Synthetic worlds: functions (n) -> uint32 grid of shape (n, n, n) ---
+
+def world_empty(n):
+    return np.zeros((n, n, n), dtype=np.uint32)
+
+
+def world_full(n):
+    return np.full((n, n, n), BlockType.Stone, dtype=np.uint32)
+
+
+def world_checkerboard(n):
+    # Worst case for face culling: every solid voxel shows all six faces
+    x, y, z = np.indices((n, n, n))
+    return np.where((x + y + z) % 2 == 0, BlockType.Stone, BlockType.Air).astype(np.uint32)
+
+
+def world_sphere(n):
+    c = (n - 1) / 2.0
+    x, y, z = np.indices((n, n, n))
+    inside = (x - c) ** 2 + (y - c) ** 2 + (z - c) ** 2 <= (n / 2.0 - 1) ** 2
+    return np.where(inside, BlockType.Dirt, BlockType.Air).astype(np.uint32)
+
+
+def world_terrain(n, seed=1234):
+    rng = np.random.default_rng(seed)
+    x, z = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    height = np.full((n, n), n * 0.4)
+    for octave in range(4):
+        freq = (2 ** octave) * 2 * np.pi / n
+        phase = rng.uniform(0, 2 * np.pi, 2)
+        height += (n * 0.15 / 2 ** octave) * np.sin(x * freq + phase[0]) * np.cos(z * freq * 1.3 + phase[1])
+    height += rng.uniform(-1.0, 1.0, (n, n))
+    height = np.clip(height, 1, n - 1).astype(np.int64)[:, None, :]
+    y = np.arange(n)[None, :, None]
+    grid = np.where(y < height - 3, BlockType.Stone, BlockType.Dirt)
+    grid = np.where(y == height - 1, BlockType.Grass, grid)
+    grid = np.where(y < height, grid, BlockType.Air)
+    return grid.astype(np.uint32)
+
+
+WORLDS = {
+    'empty': world_empty,
+    'full': world_full,
+    'checkerboard': world_checkerboard,
+    'sphere': world_sphere,
+    'terrain': world_terrain,
+}
+
+
+def make_world(args, grid=None):
+    world = World(chunk_size=args.chunk_size, world_size_in_chunks=args.chunks, headless=True)
+    if not args.workers:
+        # Synchronous meshing on this thread, so the timings are deterministic
+        world.mesh_workers.shutdown()
+        world.process_mesher.workers = 0
+    if not args.cache:
+        world.mesh_cache.budget_bytes = 0
+    if grid is not None:
+        size = world.base_chunk_size
+        n = world.world_size_in_chunks
+        for cx in range(n):
+            for cy in range(n):
+                for cz in range(n):
+                    block = grid[cx * size:(cx + 1) * size, cy * size:(cy + 1) * size, cz * size:(cz + 1) * size]
+                    if block.any():
+                        chunk = world.get_or_create_chunk((cx, cy, cz))
+                        chunk.voxels = block
+                        world.mark_dirty(chunk)
+    return world
+
+
+def settle(world):
+    """Run update_dirty_chunks until every chunk mesh is up to date."""
+    world.update_dirty_chunks()
+    while (world.dirty_chunks or world.pending_install is not None
+           or any(chunk.mesh_job is not None for chunk in world.chunks.values())):
+        time.sleep(0.001)
+        world.update_dirty_chunks()
+
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000.0)
+    return runs
+
+
+# --- Benchmarks: each returns a list of run times in milliseconds ---
+
+def bench_mesh(world, args):
+    def run():
+        for chunk in world.chunks.values():
+            chunk.build_mesh()
+    return timed(run, args.repeat)
+
+
+def bench_raycast(world, args):
+    rng = np.random.default_rng(args.seed)
+    n = world.total_size
+    center = np.full(3, n / 2.0)
+    rays = []
+    for _ in range(args.rays):
+        d = rng.normal(size=3)
+        origin = center + d / np.linalg.norm(d) * n * 0.9
+        direction = center + rng.uniform(-n / 4.0, n / 4.0, 3) - origin
+        rays.append((origin.astype(np.float32), (direction / np.linalg.norm(direction)).astype(np.float32)))
+
+    def run():
+        for origin, direction in rays:
+            Raycast(world, origin, direction, max_distance=n * 2.0).step_forward()
+    return timed(run, args.repeat)
+
+
+def bench_save_load(world, args, tmpdir):
+    manager = FileManager(world, BlockType, HistoryManager(tmpdir))
+    path = os.path.join(tmpdir, 'bench.vlx')
+    with contextlib.redirect_stdout(io.StringIO()):
+        save = timed(lambda: manager.save_world_to_path(path), args.repeat)
+
+        def load():
+            manager.load_world_from_path(path)
+            settle(world)
+        load_runs = timed(load, args.repeat)
+    return save, load_runs
+
+
+def bench_undo_redo(world, args):
+    rng = np.random.default_rng(args.seed)
+    history = ActionHistory(max_entries=args.edits)
+    n = world.total_size
+    for x, y, z in rng.integers(0, n, (args.edits, 3)):
+        prev = world.get_voxel(x, y, z)
+        new = BlockType.Air if prev else BlockType.Sand
+        world.set_voxel(x, y, z, new)
+        history.record({'type': 'set', 'pos': (int(x), int(y), int(z)), 'prev': prev, 'new': int(new)})
+    settle(world)
+
+    def run():
+        while history.undo(world):
+            pass
+        settle(world)
+        while history.redo(world):
+            pass
+        settle(world)
+    return timed(run, args.repeat)
+
+
+def run_benchmarks(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in args.worlds:
+            grid = WORLDS[name](args.chunk_size * args.chunks)
+            world = make_world(args, grid)
+            try:
+                settle(world)
+                print(f"[{name}]")
+                timings = {'mesh': bench_mesh(world, args), 'raycast': bench_raycast(world, args)}
+                timings['save'], timings['load'] = bench_save_load(world, args, tmpdir)
+                timings['undo_redo'] = bench_undo_redo(world, args)
+            finally:
+                world.shutdown()
+            for bench, runs in timings.items():
+                key = f"{bench}/{name}"
+                results[key] = {'median_ms': float(np.median(runs)), 'min_ms': float(np.min(runs)),
+                                'runs_ms': [round(r, 3) for r in runs]}
+                print(f"  {bench:<10} median {results[key]['median_ms']:9.2f} ms   min {results[key]['min_ms']:9.2f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every benchmark against `baseline`; return the keys that got slower."""
+    slower = []
+    print(f"\nComparison against baseline (threshold {threshold:.0%}):")
+    for key, result in results.items():
+        old = baseline.get('results', {}).get(key)
+        if old is None:
+            print(f"  {key:<24} new")
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] > 0 else 1.0
+        flag = ''
+        if ratio > 1.0 + threshold:
+            flag = '  <-- SLOWER'
+            slower.append(key)
+        print(f"  {key:<24} {old['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms  ({ratio:5.2f}x){flag}")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--worlds', nargs='+', choices=sorted(WORLDS), default=list(WORLDS))
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--chunks', type=int, default=4, help="chunks per axis")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rays', type=int, default=256)
+    parser.add_argument('--edits', type=int, default=500, help="recorded actions for undo/redo")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', action='store_true', help="keep the background mesh pools enabled")
+    parser.add_argument('--cache', action='store_true', help="keep the mesh cache enabled")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'config': {k: getattr(args, k) for k in ('chunk_size', 'chunks', 'repeat', 'rays', 'edits', 'seed',
+                                                 'workers', 'cache')},
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': run_benchmarks(args),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != report['config']:
+            print("Warning: baseline was recorded with a different configuration.")
+        if compare(report['results'], baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,8 +1,24 @@
 #version 330 core
 
+in vec3 v_grid_pos;
+
 out vec4 frag_color;
 
 void main()
 {
-    frag_color = vec4(0.8, 0.8, 0.8, 0.2); // Color gris claro con 20% de opacidad
-}
\ No newline at end of file
+    // Las caras del cubo son planas en un eje: su derivada es ~0 y ese eje no dibuja líneas
+    vec3 width = fwidth(v_grid_pos);
+    vec3 dist = abs(fract(v_grid_pos - 0.5) - 0.5);
+    vec3 line = vec3(0.0);
+    for (int i = 0; i < 3; i++) {
+        if (width[i] > 1e-4) {
+            // Línea de ~1 píxel con antialiasing, que se desvanece cuando las celdas ocupan menos de 2 píxeles
+            float coverage = 1.0 - clamp(dist[i] / width[i], 0.0, 1.0);
+            line[i] = coverage * clamp(2.0 - 2.0 * width[i], 0.0, 1.0);
+        }
+    }
+    float alpha = 0.2 * max(line.x, max(line.y, line.z)); // Gris claro con 20% de opacidad en las líneas
+    if (alpha <= 0.001)
+        discard;
+    frag_color = vec4(0.8, 0.8, 0.8, alpha);
+}
@@ -6,7 +6,12 @@ uniform mat4 projection;
 uniform mat4 view;
 uniform mat4 model;
 
+// Posición en coordenadas de vóxel; grid.frag dibuja una línea en cada entero
+out vec3 v_grid_pos;
+
 void main()
 {
-    gl_Position = projection * view * model * vec4(a_position, 1.0);
-}
\ No newline at end of file
+    vec4 world_pos = model * vec4(a_position, 1.0);
+    v_grid_pos = world_pos.xyz;
+    gl_Position = projection * view * world_pos;
+}
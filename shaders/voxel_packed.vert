@@ -0,0 +1,42 @@
+#version 330 core
+
+// Vértice empaquetado (8 bytes), ver data_type_vertex_packed en src/utils/Config.py:
+//   a_position_bits: x | y << 10 | z << 20          (10 bits por eje)
+//   a_attribute_bits: block_id | face << 16 | ao << 19 (16 + 3 + 4 bits)
+layout (location = 0) in uint a_position_bits;
+layout (location = 1) in uint a_attribute_bits;
+
+uniform mat4 model;
+uniform mat4 view;
+uniform mat4 projection;
+
+flat out uint v_block_type;
+out vec3 f_normal;
+out float f_ao;
+
+// Mismo orden que Mesher.FACE_DIRECTIONS: +X, -X, +Y, -Y, +Z, -Z
+const vec3 FACE_NORMALS[6] = vec3[6](
+    vec3(1.0, 0.0, 0.0), vec3(-1.0, 0.0, 0.0),
+    vec3(0.0, 1.0, 0.0), vec3(0.0, -1.0, 0.0),
+    vec3(0.0, 0.0, 1.0), vec3(0.0, 0.0, -1.0)
+);
+
+// Mismos valores que Mesher.AO_LEVELS
+const float AO_LEVELS[11] = float[11](
+    0.4, 0.475, 0.55, 0.6, 0.625, 0.7, 0.775, 0.8, 0.85, 0.925, 1.0
+);
+
+void main()
+{
+    vec3 a_pos = vec3(
+        float(a_position_bits & 1023u),
+        float((a_position_bits >> 10) & 1023u),
+        float((a_position_bits >> 20) & 1023u)
+    );
+    vec3 a_normal = FACE_NORMALS[(a_attribute_bits >> 16) & 7u];
+
+    gl_Position = projection * view * model * vec4(a_pos, 1.0);
+    f_normal = mat3(transpose(inverse(model))) * a_normal;
+    v_block_type = a_attribute_bits & 65535u;
+    f_ao = AO_LEVELS[(a_attribute_bits >> 19) & 15u];
+}
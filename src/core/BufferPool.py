@@ -0,0 +1,123 @@
+# src/core/BufferPool.py
+"""
+Reuse of GL buffer objects between chunk meshes.
+
+Every remesh used to create a new VBO/EBO pair. Buffer objects are untyped in
+GL, so a freed buffer can back either target of any later mesh. Freed buffers
+are kept in power-of-two size classes, and `Mesh` re-specifies them in place:
+`glBufferData` to the class capacity (orphaning the old storage while the GPU
+may still be reading it), then `glBufferSubData` with the real contents.
+
+The pool tracks the bytes held by live meshes and by idle buffers. Idle
+buffers beyond `GPU_POOL_MAX_IDLE_BYTES` are deleted.
+
+`QuadIndexBuffer` is the single element buffer shared by every mesh when
+Config.SHARED_QUAD_INDICES is on: quad q is always drawn as 4q + [0,1,2,0,2,3].
+"""
+import numpy as np
+from OpenGL.GL import glGenBuffers, glDeleteBuffers, glBindBuffer, glBufferData, GL_ELEMENT_ARRAY_BUFFER, GL_STATIC_DRAW
+
+from src.utils.Config import GPU_POOL_MIN_BYTES, GPU_POOL_MAX_IDLE_BYTES, QUAD_INDEX_MIN_QUADS
+from src.core.Mesher import QUAD_SPLIT_02
+
+
+def size_class(nbytes):
+    """Smallest power-of-two capacity (at least GPU_POOL_MIN_BYTES) that holds `nbytes`."""
+    capacity = GPU_POOL_MIN_BYTES
+    while capacity < nbytes:
+        capacity *= 2
+    return capacity
+
+
+class GpuBufferPool:
+    def __init__(self, max_idle_bytes=GPU_POOL_MAX_IDLE_BYTES):
+        self.max_idle_bytes = max_idle_bytes
+        self.idle = {}  # capacity -> [buffer ids whose storage has that capacity]
+        self.idle_bytes = 0
+        self.live_bytes = 0
+        self.live_buffers = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, nbytes):
+        """
+        Return (buffer, capacity) for `nbytes` of data. `capacity` is 0 for a
+        fresh buffer with no storage yet; the caller specifies it with
+        `glBufferData` and reports it through `resize`.
+        """
+        capacity = size_class(nbytes)
+        free = self.idle.get(capacity)
+        self.live_buffers += 1
+        if free:
+            self.idle_bytes -= capacity
+            self.live_bytes += capacity
+            self.reused += 1
+            return free.pop(), capacity
+        self.created += 1
+        return int(glGenBuffers(1)), 0
+
+    def resize(self, old_capacity, new_capacity):
+        """A live buffer's storage was re-specified from `old_capacity` to `new_capacity` bytes."""
+        self.live_bytes += new_capacity - old_capacity
+
+    def release(self, buffer, capacity):
+        """Give a buffer back. It stays allocated for reuse unless the idle budget is full."""
+        self.live_buffers -= 1
+        self.live_bytes -= capacity
+        if capacity == 0 or self.idle_bytes + capacity > self.max_idle_bytes:
+            glDeleteBuffers(1, (buffer,))
+            return
+        self.idle.setdefault(capacity, []).append(buffer)
+        self.idle_bytes += capacity
+
+    def clear(self):
+        """Delete every idle buffer (on shutdown, while the GL context is still current)."""
+        for buffers in self.idle.values():
+            if buffers:
+                glDeleteBuffers(len(buffers), buffers)
+        self.idle.clear()
+        self.idle_bytes = 0
+
+    def stats(self):
+        return {'live_bytes': self.live_bytes, 'idle_bytes': self.idle_bytes,
+                'live_buffers': self.live_buffers, 'created': self.created, 'reused': self.reused}
+
+
+class QuadIndexBuffer:
+    def __init__(self, min_quads=QUAD_INDEX_MIN_QUADS):
+        self.min_quads = min_quads
+        self.buffer = None
+        self.quads = 0
+
+    def bind(self, quads):
+        """
+        Bind the shared buffer to GL_ELEMENT_ARRAY_BUFFER, growing it first if
+        it covers fewer than `quads` quads. Call it with the mesh VAO bound:
+        the element binding is VAO state. Growing keeps the buffer name, so
+        VAOs bound to it earlier see the larger storage too.
+        """
+        if self.buffer is None:
+            self.buffer = int(glGenBuffers(1))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.buffer)
+        if quads > self.quads:
+            capacity = max(self.min_quads, self.quads)
+            while capacity < quads:
+                capacity *= 2
+            indices = ((np.arange(capacity, dtype=np.uint32) * 4)[:, None] + QUAD_SPLIT_02).reshape(-1)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+            self.quads = capacity
+
+    @property
+    def nbytes(self):
+        return self.quads * 6 * 4
+
+    def destroy(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, (self.buffer,))
+        self.buffer = None
+        self.quads = 0
+
+
+# Shared by every Mesh; there is a single GL context.
+buffer_pool = GpuBufferPool()
+quad_indices = QuadIndexBuffer()
@@ -35,6 +35,9 @@ class Camera:
         self.pan_sensitivity = 0.002
         self.min_distance = 1.0
         self.max_distance = 128.0
+        # Projection far plane and world size it was fitted to (see fit_world)
+        self.far_plane = 1024.0
+        self.world_size = None
 
         # keyboard movement speed (used for panning with WASD/space/ctrl)
         self.speed = 5.0
@@ -47,6 +50,22 @@ class Camera:
         # initialize camera position from spherical coords
         self.update_position_from_spherical()
 
+    def fit_world(self, world_size):
+        """
+        Ajusta el zoom máximo y el plano lejano para poder ver el mundo entero
+        (world_size vóxeles por eje). Si el tamaño cambia (redimensionar, cargar
+        un modelo mayor) el objetivo vuelve al centro del nuevo mundo.
+        """
+        world_size = float(world_size)
+        self.max_distance = max(128.0, 2.0 * world_size)
+        # The farthest corner of the world, seen from the maximum zoom, stays in front of it
+        self.far_plane = max(1024.0, self.max_distance + world_size * math.sqrt(3))
+        if self.world_size is not None and world_size != self.world_size:
+            self.target = np.array([world_size / 2, 5, world_size / 2], dtype=np.float32)
+            self.distance = min(self.distance, self.max_distance)
+            self.update_position_from_spherical()
+        self.world_size = world_size
+
     def get_view_matrix(self):
         return pyrr.matrix44.create_look_at(self.position, self.target, self.up)
 
@@ -1,24 +1,195 @@
 # src/Chunk.py
 import numpy as np
-from src.utils.Config import data_type_vertex
-from src.core.Mesh import Mesh
+from src.utils.Config import data_type_vertex, VERTEX_FORMAT, SHARED_QUAD_INDICES, OCCUPANCY_BRICK_SIZE
+from src.core.Mesh import Mesh, HeadlessMesh
+from src.core.Mesher import compute_faces, greedy_merge, emit_quads, pack_vertices, share_quad_indices
+from src.core.MeshWorker import build_chunk_mesh, empty_mesh_result
+from src.core.PaletteStorage import PaletteStorage
+from OpenGL.GL import GL_STATIC_DRAW, GL_DYNAMIC_DRAW
 import pyrr
 
 class Chunk:
     def __init__(self, world, position, size):
         self.world = world
-        self.position = position # (cx, cz)
+        self.position = position # (cx, cy, cz)
         self.size = size
         
-        self.voxels = np.zeros((size, size, size), dtype=np.uint32)
+        # Paleta comprimida; `voxels` da la vista uint32 descomprimida cuando se necesita
+        self.storage = PaletteStorage(size)
+        # Resumen de ocupación, actualizado en cada edición (ver note_changes):
+        # número de vóxeles no-aire y su AABB local [lo, hi), None si está vacío
+        self.solid_count = 0
+        self._bounds = None
+        self._bounds_stale = False
+        # Vóxeles no-aire por brick (nivel fino de la pirámide de ocupación del
+        # raycast); se calcula al primer uso y luego se mantiene en cada edición
+        self.brick_size = OCCUPANCY_BRICK_SIZE if size % OCCUPANCY_BRICK_SIZE == 0 else size
+        self._brick_counts = None
         self.mesh = None
+        # Face-slot table used to patch the mesh in place (vectorized, non-greedy builds only)
+        self.slots = None
+        # Bumped on every edit; background results built from an older version are dropped
+        self.version = 0
+        # Future of the background rebuild in flight, if any, and its MeshCache key
+        self.mesh_job = None
+        self.mesh_job_key = None
+        # Visible faces and emitted quads of the last build (they differ with greedy meshing)
+        self.face_count = 0
+        self.quad_count = 0
         
         self.model_matrix = pyrr.matrix44.create_from_translation(
-            [position[0] * size, 0, position[1] * size], dtype=np.float32)
+            [position[0] * size, position[1] * size, position[2] * size], dtype=np.float32)
+
+    @property
+    def voxels(self):
+        """
+        (size, size, size) uint32 array of block ids. Unpacks the chunk if it
+        was compacted; World packs it again once it falls out of its LRU of
+        unpacked chunks. Do not keep the array across frames.
+        """
+        if self.storage.is_packed:
+            self.storage.unpacked()
+        self.world.touch_unpacked(self)
+        return self.storage.dense
+
+    @voxels.setter
+    def voxels(self, array):
+        self.writable_voxels()[...] = array
+        self.refresh_summary()
+
+    def writable_voxels(self):
+        """ `voxels` para escribir en sitio: si una instantánea comparte el array, antes se copia. """
+        self.voxels
+        self.storage.make_writable()
+        return self.storage.dense
+
+    def adopt_storage(self, storage, solid_count):
+        """ Sustituye el almacenamiento por uno ya preparado (World.begin_install) sin descomprimirlo. """
+        self.storage = storage
+        self.solid_count = solid_count
+        self._bounds_stale = True
+        self._brick_counts = None
+
+    def fill(self, block_type):
+        """ Rellena todo el chunk con un bloque (queda comprimido, sin datos por vóxel). """
+        self.storage.fill(block_type)
+        self.solid_count = self.size ** 3 if block_type else 0
+        self._bounds = ((0, 0, 0), (self.size,) * 3) if block_type else None
+        self._bounds_stale = False
+        self._brick_counts = None
+
+    def is_empty(self):
+        return self.solid_count == 0
+
+    @property
+    def is_full(self):
+        return self.solid_count == self.size ** 3
+
+    @property
+    def bounds(self):
+        """ AABB local (lo, hi) de los vóxeles no-aire, o None si el chunk está vacío. """
+        if self._bounds_stale:
+            self._bounds_stale = False
+            self._bounds = None
+            if self.solid_count:
+                solid = self.voxels != 0
+                lo, hi = [], []
+                for axis in range(3):
+                    occupied = np.flatnonzero(solid.any(axis=tuple(a for a in range(3) if a != axis)))
+                    lo.append(int(occupied[0]))
+                    hi.append(int(occupied[-1]) + 1)
+                self._bounds = (tuple(lo), tuple(hi))
+        return self._bounds
+
+    def refresh_summary(self):
+        """ Recalcula el resumen tras escribir directamente en `voxels`. """
+        self.solid_count = int(np.count_nonzero(self.voxels))
+        self._bounds_stale = True
+        self._brick_counts = None
+
+    @property
+    def brick_counts(self):
+        """ (n, n, n) número de vóxeles no-aire de cada brick de `brick_size`^3. """
+        if self._brick_counts is None:
+            b = self.brick_size
+            n = self.size // b
+            solid = (self.voxels != 0).reshape(n, b, n, b, n, b)
+            self._brick_counts = solid.sum(axis=(1, 3, 5), dtype=np.int32)
+        return self._brick_counts
+
+    def note_changes(self, local, prev, new):
+        """
+        Update the summary after the cells `local` ((N, 3) local coordinates)
+        changed from `prev` to `new` (arrays, or a scalar for `new`).
+        """
+        was = prev != 0
+        now = np.broadcast_to(np.asarray(new) != 0, was.shape)
+        added, removed = local[now & ~was], local[was & ~now]
+        self.solid_count += len(added) - len(removed)
+        if self._brick_counts is not None:
+            np.add.at(self._brick_counts, tuple((added // self.brick_size).T), 1)
+            np.subtract.at(self._brick_counts, tuple((removed // self.brick_size).T), 1)
+        if self.solid_count == 0:
+            self._bounds, self._bounds_stale = None, False
+        elif len(removed) and not self._bounds_stale:
+            # Only a removal on the box faces can shrink it; recomputed lazily
+            lo, hi = self._bounds
+            if ((removed == lo) | (removed == np.subtract(hi, 1))).any():
+                self._bounds_stale = True
+        if len(added) and not self._bounds_stale:
+            lo, hi = added.min(axis=0), added.max(axis=0) + 1
+            if self._bounds is not None:
+                lo, hi = np.minimum(lo, self._bounds[0]), np.maximum(hi, self._bounds[1])
+            self._bounds = (tuple(int(c) for c in lo), tuple(int(c) for c in hi))
+
+    def get_voxel(self, x, y, z):
+        return self.storage.get(x, y, z)
 
     def set_voxel(self, x, y, z, block_type):
         if 0 <= x < self.size and 0 <= y < self.size and 0 <= z < self.size:
-            self.voxels[x, y, z] = block_type
+            prev = self.storage.get(x, y, z)
+            self.storage.set(x, y, z, block_type)
+            if (prev != 0) != (block_type != 0):
+                self._note_voxel(x, y, z, block_type != 0)
+
+    def _note_voxel(self, x, y, z, added):
+        # Escalar de note_changes para set_voxel
+        if self._brick_counts is not None:
+            b = self.brick_size
+            self._brick_counts[x // b, y // b, z // b] += 1 if added else -1
+        if added:
+            self.solid_count += 1
+            if not self._bounds_stale:
+                if self._bounds is None:
+                    self._bounds = ((x, y, z), (x + 1, y + 1, z + 1))
+                else:
+                    lo, hi = self._bounds
+                    self._bounds = ((min(lo[0], x), min(lo[1], y), min(lo[2], z)),
+                                    (max(hi[0], x + 1), max(hi[1], y + 1), max(hi[2], z + 1)))
+            return
+        self.solid_count -= 1
+        if self.solid_count == 0:
+            self._bounds, self._bounds_stale = None, False
+        elif not self._bounds_stale:
+            lo, hi = self._bounds
+            if x in (lo[0], hi[0] - 1) or y in (lo[1], hi[1] - 1) or z in (lo[2], hi[2] - 1):
+                self._bounds_stale = True
+
+    def is_buried(self):
+        """ Lleno y rodeado por seis vecinos llenos dentro del mundo: no tiene ninguna cara visible. """
+        if not self.is_full:
+            return False
+        cx, cy, cz = self.position
+        for neighbour in ((cx - 1, cy, cz), (cx + 1, cy, cz), (cx, cy - 1, cz),
+                          (cx, cy + 1, cz), (cx, cy, cz - 1), (cx, cy, cz + 1)):
+            chunk = self.world.chunks.get(neighbour)
+            if chunk is None or not chunk.is_full:
+                return False
+        return True
+
+    def has_no_faces(self):
+        """ True when meshing can be skipped: the chunk is empty or buried. """
+        return self.solid_count == 0 or self.is_buried()
     
     def is_solid(self, x, y, z):
         # Aquí se esperan coordenadas LOCALES (relativas al chunk).
@@ -26,10 +197,12 @@ class Chunk:
         if not (0 <= x < self.size and 0 <= y < self.size and 0 <= z < self.size):
             return False
         # El bloque 0 (Air) no es sólido.
-        return self.voxels[x, y, z] > 0
+        return self.storage.get(x, y, z) > 0
 
     def get_global_pos(self, x, y, z):
-        return (self.position[0] * self.size + x, y, self.position[1] * self.size + z)
+        return (self.position[0] * self.size + x,
+                self.position[1] * self.size + y,
+                self.position[2] * self.size + z)
 
     def calculate_ao(self, side1, side2, corner):
         """
@@ -85,14 +258,20 @@ class Chunk:
         if ao > 1.0: ao = 1.0
         return float(ao)
 
-    def build_mesh(self):
+    def build_mesh_legacy(self):
+        """
+        Reference per-voxel mesher. Kept for comparison with the vectorized
+        engine in `src.core.Mesher`. Returns (vertices, indices), or
+        (None, None) when the chunk has no visible face.
+        """
         vertex_list, index_list = [], []
         vertex_index_counter = 0
+        voxels = self.voxels
 
         for x in range(self.size):
             for y in range(self.size):
                 for z in range(self.size):
-                    block_type = self.voxels[x, y, z]
+                    block_type = voxels[x, y, z]
                     if block_type == 0: # 0 es Aire
                         continue
                     
@@ -387,15 +566,158 @@ class Chunk:
                     # --- ✨ FIN DE LA CORRECCIÓN ✨ ---
 
         if not vertex_list:
-            if self.mesh:
-                self.mesh.destroy()
-            self.mesh = None
-            return
+            return None, None
 
         # Ahora la conversión a np.array funcionará correctamente
         vertices = np.array(vertex_list, dtype=data_type_vertex)
         indices = np.array(index_list, dtype=np.uint32)
-        
+        return vertices, indices
+
+    def get_padded_voxels(self, lo=(0, 0, 0), hi=None):
+        """
+        Copy of the block ids of the local box [lo, hi) (the whole chunk by
+        default) plus a one-voxel border read from the world.
+        """
+        if hi is None:
+            hi = (self.size, self.size, self.size)
+        gx, gy, gz = self.get_global_pos(*lo)
+        ex, ey, ez = self.get_global_pos(*hi)
+        return self.world.get_region(gx - 1, gy - 1, gz - 1, ex + 1, ey + 1, ez + 1)
+
+    def collect_faces(self, lo=(0, 0, 0), hi=None):
+        """Visible faces of the local box [lo, hi), with coordinates relative to `lo`."""
+        return compute_faces(self.get_padded_voxels(lo, hi), origin=self.get_global_pos(*lo))
+
+    def build_geometry(self):
+        """
+        Vectorized mesher: emits the same arrays as `build_mesh_legacy`, or
+        merged rectangles when the world has greedy meshing enabled.
+        """
+        faces = self.collect_faces()
+        self.face_count = len(faces['face'])
+        if self.world.greedy_meshing and self.face_count:
+            faces = greedy_merge(faces)
+        self.quad_count = len(faces['face'])
+        if not self.quad_count:
+            return None, None
+        return emit_quads(faces)
+
+    def build_mesh(self):
+        """ Reconstruye la malla de forma síncrona en el hilo de GL. """
+        if self.has_no_faces():
+            self.apply_mesh_result(empty_mesh_result())
+        elif self.world.mesher == 'legacy':
+            vertices, indices = self.build_mesh_legacy()
+            count = 0 if vertices is None else len(vertices) // 4
+            if vertices is not None and VERTEX_FORMAT == 'packed':
+                vertices = pack_vertices(vertices)
+            if vertices is not None and SHARED_QUAD_INDICES:
+                vertices, indices = share_quad_indices(vertices, indices), None
+            self.apply_mesh_result({'face_count': count, 'quad_count': count, 'slots': None,
+                                    'vertices': vertices, 'indices': indices})
+        else:
+            padded, key = self.get_padded_voxels(), None
+            origin, greedy = self.get_global_pos(0, 0, 0), self.world.greedy_meshing
+            if self.world.mesh_cache.enabled:
+                key = self.world.mesh_cache.key(padded, origin, greedy)
+                result = self.world.mesh_cache.get(key)
+                if result is not None:
+                    self.apply_mesh_result(result)
+                    return
+            result = build_chunk_mesh(padded, origin, self.size, greedy)
+            self.world.mesh_cache.put(key, result)
+            self.apply_mesh_result(result)
+
+    def try_cached_mesh(self, padded):
+        """
+        Aplica la malla cacheada para `padded` si existe. Si no, guarda la clave
+        en `mesh_job_key` para cachear el resultado del trabajo que se envíe.
+        """
+        cache = self.world.mesh_cache
+        self.mesh_job_key = None
+        if not cache.enabled:
+            return False
+        key = cache.key(padded, self.get_global_pos(0, 0, 0), self.world.greedy_meshing)
+        result = cache.get(key)
+        if result is None:
+            self.mesh_job_key = key
+            return False
+        self.apply_mesh_result(result)
+        return True
+
+    def submit_mesh_job(self, pool):
+        """ Encola la reconstrucción en el pool de workers; la malla actual se sigue dibujando. """
+        if self.has_no_faces():
+            self.apply_mesh_result(empty_mesh_result())
+            return
+        padded = self.get_padded_voxels()
+        if self.try_cached_mesh(padded):
+            return
+        self.mesh_job = pool.submit(self, self.version, padded,
+                                    self.get_global_pos(0, 0, 0), self.world.greedy_meshing)
+
+    def apply_mesh_result(self, result):
+        """ Sube a la GPU el resultado de `build_chunk_mesh` (solo en el hilo de GL). """
+        self.face_count = result['face_count']
+        self.quad_count = result['quad_count']
+        self.slots = result['slots']
+        vertices, indices = result['vertices'], result['indices']
+
         if self.mesh:
             self.mesh.destroy()
-        self.mesh = Mesh(vertices, indices)
\ No newline at end of file
+        if vertices is None:
+            self.mesh = None
+            return
+        mesh_class = HeadlessMesh if self.world.headless else Mesh
+        self.mesh = mesh_class(vertices, indices, GL_DYNAMIC_DRAW if self.slots else GL_STATIC_DRAW)
+        if self.slots:
+            self.mesh.index_count = self.slots.draw_count
+
+    def can_patch(self):
+        """True when the current mesh keeps a face-slot table that can be patched in place."""
+        return (self.slots is not None and self.mesh is not None and
+                self.world.mesher != 'legacy' and not self.world.greedy_meshing)
+
+    def patch_mesh(self, edits):
+        """
+        Update the mesh after single-voxel edits at the local positions in
+        `edits` (they may lie one voxel outside the chunk for edits in a
+        neighbour). Only the faces of the edited voxel and its 26 neighbours
+        are re-meshed; the GPU buffers are patched over the touched slots.
+        """
+        for edit in set(edits):
+            lo, hi = self._patch_box(edit, tuple(c + 1 for c in edit))
+            if any(l >= h for l, h in zip(lo, hi)):
+                continue
+            self.slots.replace_region(lo, hi, self.collect_faces(lo, hi))
+        self._upload_patch()
+
+    def _patch_box(self, lo, hi):
+        # Cells whose faces can change after an edit of [lo, hi): one more voxel around it for AO
+        return (tuple(max(c - 1, 0) for c in lo), tuple(min(c + 1, self.size) for c in hi))
+
+    def region_volume(self, lo, hi):
+        """ Celdas a re-mallar por `patch_region(lo, hi)`. """
+        lo, hi = self._patch_box(lo, hi)
+        return int(np.prod([max(h - l, 0) for l, h in zip(lo, hi)]))
+
+    def patch_region(self, lo, hi):
+        """
+        Update the mesh after edits inside the local box [lo, hi) (it may
+        reach one voxel outside the chunk for edits in a neighbour): the faces
+        of that box grown by one voxel are re-meshed and spliced into the
+        face slots, and only the touched slot range is uploaded.
+        """
+        lo, hi = self._patch_box(lo, hi)
+        if all(l < h for l, h in zip(lo, hi)):
+            self.slots.replace_region(lo, hi, self.collect_faces(lo, hi))
+        self._upload_patch()
+
+    def _upload_patch(self):
+        first, last, grown = self.slots.take_dirty()
+        if grown:
+            self.mesh.upload(self.slots.vertices, self.slots.indices)
+        else:
+            self.mesh.update_quads(first, last, self.slots.vertices, self.slots.indices)
+        self.mesh.index_count = self.slots.draw_count
+        self.face_count = self.quad_count = self.slots.quad_count
@@ -1,48 +1,138 @@
 # Mesh.py
-from src.utils.Config import data_type_vertex
+from src.utils.Config import data_type_vertex, data_type_vertex_packed
 import numpy as np
 from OpenGL.GL import (
-    glGenVertexArrays, glBindVertexArray, glGenBuffers, glBindBuffer, glBufferData,
+    glGenVertexArrays, glBindVertexArray, glBindBuffer, glBufferData, glBufferSubData,
     glEnableVertexAttribArray, glVertexAttribPointer, glVertexAttribIPointer, glDeleteVertexArrays,
     GL_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_UNSIGNED_INT
 )
 from OpenGL.GL import GL_ELEMENT_ARRAY_BUFFER, GL_FALSE
 import ctypes
+from src.core.BufferPool import buffer_pool, quad_indices, size_class
 
 class Mesh:
-    def __init__(self, vertices, indices):
-        self.vertex_count = len(vertices)
-        self.index_count = len(indices)
+    def __init__(self, vertices, indices, usage=GL_STATIC_DRAW):
+        self.usage = usage
+        self.pool = buffer_pool
 
         self.vao = glGenVertexArrays(1)
         glBindVertexArray(self.vao)
 
-        self.vbo = glGenBuffers(1)
+        # VBO/EBO come from the shared pool; their capacity may exceed the data.
+        # Without `indices` the mesh draws with the shared quad index buffer instead of its own EBO.
+        self.vbo, self.vbo_capacity = self.pool.acquire(vertices.nbytes)
+        self.ebo, self.ebo_capacity = self.pool.acquire(indices.nbytes) if indices is not None else (None, 0)
+        self.upload(vertices, indices)
+        glBindVertexArray(self.vao)
         glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
-        
-        self.ebo = glGenBuffers(1)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
-
-        # Atributo 0: Posición (offset 0)
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(0))
-
-        # Atributo 1: Normal (offset 12)
-        glEnableVertexAttribArray(1)
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(12))
-
-        # Atributo 2: Índice de color (offset 24)
-        glEnableVertexAttribArray(2)
-        glVertexAttribIPointer(2, 1, GL_UNSIGNED_INT, data_type_vertex.itemsize, ctypes.c_void_p(24))
-        
-        # --- NUEVO ATRIBUTO PARA AO ---
-        # Atributo 3: Oclusión Ambiental (offset 28)
-        glEnableVertexAttribArray(3)
-        glVertexAttribPointer(3, 1, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(28))
+
+        if vertices.dtype == data_type_vertex_packed:
+            # Layout compacto: dos uint32 con campos de bits, decodificados en voxel_packed.vert
+            stride = data_type_vertex_packed.itemsize
+            glEnableVertexAttribArray(0)
+            glVertexAttribIPointer(0, 1, GL_UNSIGNED_INT, stride, ctypes.c_void_p(0))
+            glEnableVertexAttribArray(1)
+            glVertexAttribIPointer(1, 1, GL_UNSIGNED_INT, stride, ctypes.c_void_p(4))
+        else:
+            # Atributo 0: Posición (offset 0)
+            glEnableVertexAttribArray(0)
+            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(0))
+
+            # Atributo 1: Normal (offset 12)
+            glEnableVertexAttribArray(1)
+            glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(12))
+
+            # Atributo 2: Índice de color (offset 24)
+            glEnableVertexAttribArray(2)
+            glVertexAttribIPointer(2, 1, GL_UNSIGNED_INT, data_type_vertex.itemsize, ctypes.c_void_p(24))
+
+            # --- NUEVO ATRIBUTO PARA AO ---
+            # Atributo 3: Oclusión Ambiental (offset 28)
+            glEnableVertexAttribArray(3)
+            glVertexAttribPointer(3, 1, GL_FLOAT, GL_FALSE, data_type_vertex.itemsize, ctypes.c_void_p(28))
 
         glBindVertexArray(0)
 
+    def upload(self, vertices, indices):
+        """(Re)specify both buffers with new contents. `indices` is None for shared-index meshes."""
+        self.vertex_count = len(vertices)
+        self.index_count = len(indices) if indices is not None else len(vertices) // 4 * 6
+
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        self.vbo_capacity = self._respecify(GL_ARRAY_BUFFER, self.vbo_capacity, vertices)
+        if indices is None:
+            quad_indices.bind(len(vertices) // 4)
+        else:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+            self.ebo_capacity = self._respecify(GL_ELEMENT_ARRAY_BUFFER, self.ebo_capacity, indices)
+        glBindVertexArray(0)
+
+    def _respecify(self, target, capacity, data):
+        """
+        Orphan the bound buffer and write `data` at offset 0. The storage keeps
+        its size class unless the data outgrew it. Returns the new capacity.
+        """
+        new_capacity = max(capacity, size_class(data.nbytes))
+        self.pool.resize(capacity, new_capacity)
+        glBufferData(target, new_capacity, None, self.usage)
+        if data.nbytes:
+            glBufferSubData(target, 0, data.nbytes, data)
+        return new_capacity
+
+    def update_quads(self, first, last, vertices, indices):
+        """
+        Patch quads [first, last) in place with glBufferSubData. `vertices`
+        and `indices` are the full CPU arrays (4 vertices / 6 indices per quad;
+        `indices` is None for shared-index meshes).
+        """
+        if last <= first:
+            return
+        v = vertices[first * 4:last * 4]
+        # The element buffer binding is VAO state, so bind ours before touching it.
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, first * 4 * vertices.itemsize, v.nbytes, v)
+        if indices is not None:
+            i = indices[first * 6:last * 6]
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+            glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, first * 6 * indices.itemsize, i.nbytes, i)
+        glBindVertexArray(0)
+
+    def destroy(self):
+        if self.vao is None:
+            return
+        glDeleteVertexArrays(1, (self.vao,))
+        self.pool.release(self.vbo, self.vbo_capacity)
+        if self.ebo is not None:
+            self.pool.release(self.ebo, self.ebo_capacity)
+        self.vao = self.vbo = self.ebo = None
+
+
+class HeadlessMesh:
+    """
+    Stand-in for `Mesh` when there is no GL context (World(headless=True),
+    e.g. benchmark.py). Same interface; it only counts the bytes that would
+    have been uploaded.
+    """
+    vao = None
+
+    def __init__(self, vertices, indices, usage=GL_STATIC_DRAW):
+        self.usage = usage
+        self.uploaded_bytes = 0
+        self.upload(vertices, indices)
+
+    def upload(self, vertices, indices):
+        self.vertex_count = len(vertices)
+        self.index_count = len(indices) if indices is not None else len(vertices) // 4 * 6
+        self.uploaded_bytes += vertices.nbytes + (indices.nbytes if indices is not None else 0)
+
+    def update_quads(self, first, last, vertices, indices):
+        if last <= first:
+            return
+        self.uploaded_bytes += (last - first) * 4 * vertices.itemsize
+        if indices is not None:
+            self.uploaded_bytes += (last - first) * 6 * indices.itemsize
+
     def destroy(self):
-        glDeleteVertexArrays(1, (self.vao,))
\ No newline at end of file
+        pass
@@ -0,0 +1,102 @@
+# src/core/MeshCache.py
+"""
+Content-addressed cache of CPU chunk meshes.
+
+A chunk mesh only depends on the padded voxel block (the chunk plus its
+one-voxel border from the neighbours), the greedy flag and, through the AO
+tie-break checkerboard in `Mesher.quad_split`, the parity of the chunk
+origin. Vertex positions are chunk-local, so equal keys give equal meshes.
+Undo/redo of large edits, reloading a file or toggling greedy meshing then
+costs an upload instead of a remesh.
+
+Entries are `build_chunk_mesh` results, evicted least-recently-used once
+their arrays exceed the byte budget. Chunks patch their SlotMesh in place,
+so SlotMeshes are copied on the way in and on the way out.
+
+Background loads mesh on the loader thread and use the cache from there
+too, so every access takes `lock`.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Rough per-entry overhead, so empty meshes still count against the budget
+ENTRY_OVERHEAD = 128
+
+
+def _result_bytes(result):
+    total = ENTRY_OVERHEAD
+    for name in ('vertices', 'indices'):
+        if result[name] is not None:
+            total += result[name].nbytes
+    if result['slots'] is not None:
+        total += result['slots'].slot_table.nbytes
+    return total
+
+
+def _copy_result(result):
+    result = dict(result)
+    if result['slots'] is not None:
+        slots = result['slots'].copy()
+        result['slots'], result['vertices'], result['indices'] = slots, slots.vertices, slots.indices
+    return result
+
+
+class MeshCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # key -> (result, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.budget_bytes > 0
+
+    @staticmethod
+    def key(padded, origin, greedy):
+        digest = hashlib.blake2b(np.ascontiguousarray(padded), digest_size=16).digest()
+        return (digest, padded.shape, sum(origin) & 1, bool(greedy))
+
+    def get(self, key):
+        """Return a private copy of the cached result for `key`, or None."""
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(entry[0])
+
+    def put(self, key, result):
+        if not self.enabled or key is None:
+            return
+        size = _result_bytes(result)
+        if size > self.budget_bytes:
+            return
+        result = _copy_result(result)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.budget_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,83 @@
+# src/core/MeshWorker.py
+"""
+Background chunk meshing.
+
+The GL thread snapshots a chunk (its voxels plus the one-voxel border, see
+`Chunk.get_padded_voxels`) and hands it to a thread pool. Workers only run
+NumPy code on that private copy, so they never touch the live world. Finished
+results are queued and uploaded by the GL thread in `World.update_dirty_chunks`.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.Mesher import compute_faces, greedy_merge, emit_quads
+from src.core.SlotMesh import SlotMesh
+
+
+def empty_mesh_result():
+    """Result of a chunk without visible faces (see `Chunk.has_no_faces`)."""
+    return {'face_count': 0, 'quad_count': 0, 'slots': None, 'vertices': None, 'indices': None}
+
+
+def build_chunk_mesh(padded, origin, size, greedy):
+    """
+    CPU half of a chunk rebuild. Returns a dict with the face/quad counts and
+    either a SlotMesh (patchable, non-greedy) or plain vertex/index arrays.
+    """
+    faces = compute_faces(padded, origin)
+    face_count = len(faces['face'])
+    result = empty_mesh_result()
+    if not face_count:
+        return result
+    result['face_count'] = result['quad_count'] = face_count
+
+    if greedy:
+        faces = greedy_merge(faces)
+        result['quad_count'] = len(faces['face'])
+        result['vertices'], result['indices'] = emit_quads(faces)
+    else:
+        slots = SlotMesh(size, face_count)
+        slots.replace_region((0, 0, 0), (size, size, size), faces)
+        slots.take_dirty()
+        result['slots'] = slots
+        result['vertices'], result['indices'] = slots.vertices, slots.indices
+    return result
+
+
+class MeshWorkerPool:
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mesher') if workers > 0 else None
+        self.results = queue.Queue()
+
+    @property
+    def enabled(self):
+        return self.executor is not None
+
+    def submit(self, chunk, version, padded, origin, greedy):
+        """Queue a rebuild of `chunk` from the snapshot `padded` taken at `version`."""
+        future = self.executor.submit(build_chunk_mesh, padded, origin, chunk.size, greedy)
+        future.add_done_callback(lambda f: self.results.put((chunk, version, f)))
+        return future
+
+    def poll(self):
+        """Yield (chunk, version, result) for every finished job. Failed jobs are reported and the chunk marked dirty again."""
+        while True:
+            try:
+                chunk, version, future = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"Error meshing chunk {chunk.position}: {error}")
+                chunk.mesh_job = None
+                # Its mesh is stale; rebuild it on the next update
+                chunk.world.mark_dirty(chunk)
+                continue
+            yield chunk, version, future.result()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
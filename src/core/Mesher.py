@@ -0,0 +1,302 @@
+# src/core/Mesher.py
+"""
+Vectorized face-culling mesher.
+
+Works on a block-id array padded by one cell on every side (the padding holds
+the neighbouring voxels, or air outside the world) and emits the same quads,
+AO values and triangle-flip choices as the legacy per-voxel loop in
+`Chunk.build_mesh_legacy`, but with whole-array NumPy operations.
+"""
+import numpy as np
+from src.utils.Config import data_type_vertex, data_type_vertex_packed, VERTEX_FORMAT, SHARED_QUAD_INDICES
+
+# The six face directions in the order the legacy mesher emits them:
+# +X, -X, +Y, -Y, +Z, -Z. Each entry is the face normal followed by the
+# corner offsets of its four vertices (relative to the voxel origin) in quad order.
+FACE_DIRECTIONS = (
+    ((1, 0, 0),  ((1, 1, 0), (1, 0, 0), (1, 0, 1), (1, 1, 1))),
+    ((-1, 0, 0), ((0, 1, 1), (0, 0, 1), (0, 0, 0), (0, 1, 0))),
+    ((0, 1, 0),  ((0, 1, 1), (0, 1, 0), (1, 1, 0), (1, 1, 1))),
+    ((0, -1, 0), ((1, 0, 1), (1, 0, 0), (0, 0, 0), (0, 0, 1))),
+    ((0, 0, 1),  ((1, 1, 1), (1, 0, 1), (0, 0, 1), (0, 1, 1))),
+    ((0, 0, -1), ((0, 1, 0), (0, 0, 0), (1, 0, 0), (1, 1, 0))),
+)
+
+FACE_NORMALS = np.array([d[0] for d in FACE_DIRECTIONS], dtype=np.int64)          # (6, 3)
+FACE_CORNERS = np.array([d[1] for d in FACE_DIRECTIONS], dtype=np.int64)          # (6, 4, 3)
+
+# The two tangent axes of every face as unit vectors (the axes where the normal is 0).
+# The side/corner AO samples of a vertex are taken towards the vertex along these
+# axes. The legacy -Z face samples X mirrored (its 'l' neighbour is x+1), so its
+# U axis points to -X to keep the shading identical.
+FACE_TANGENT_U = np.array([
+    (0, 1, 0), (0, 1, 0), (1, 0, 0), (1, 0, 0), (1, 0, 0), (-1, 0, 0),
+], dtype=np.int64)                                                                 # (6, 3)
+FACE_TANGENT_V = np.array([
+    (0, 0, 1), (0, 0, 1), (0, 0, 1), (0, 0, 1), (0, 1, 0), (0, 1, 0),
+], dtype=np.int64)                                                                 # (6, 3)
+
+# Index patterns for one quad. QUAD_SPLIT_02 uses the 0-2 diagonal, QUAD_SPLIT_13 the 1-3 one.
+QUAD_SPLIT_02 = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+QUAD_SPLIT_13 = np.array([0, 1, 3, 3, 1, 2], dtype=np.uint32)
+# With a shared index buffer every quad is drawn with QUAD_SPLIT_02; a 1-3 split
+# is encoded by emitting the corners in this order instead (same triangles and winding).
+QUAD_ROTATE_13 = np.array([1, 2, 3, 0], dtype=np.int64)
+
+# Same mapping as Chunk.calculate_ao: occlusion count (0..3) -> AO factor.
+AO_LOOKUP = np.array([1.0, 0.8, 0.6, 0.4], dtype=np.float64)
+
+
+def face_mask(padded):
+    """
+    Return a bool array of shape (X, Y, Z, 6) telling which faces of the
+    interior cells of `padded` are exposed (solid voxel, non-solid neighbour).
+    """
+    occ = padded > 0
+    sx, sy, sz = (n - 2 for n in padded.shape)
+    solid = occ[1:-1, 1:-1, 1:-1]
+    mask = np.empty((sx, sy, sz, 6), dtype=bool)
+    for f, (nx, ny, nz) in enumerate(FACE_NORMALS):
+        neighbour = occ[1 + nx:1 + nx + sx, 1 + ny:1 + ny + sy, 1 + nz:1 + nz + sz]
+        mask[..., f] = solid & ~neighbour
+    return mask
+
+
+# Sample offsets (relative to the voxel) of the side/side/corner AO neighbours of
+# every (face, vertex) pair: the cell in front of the face stepped towards the vertex.
+_AO_SIGN = 2 * FACE_CORNERS - 1                                                    # (6, 4, 3)
+AO_SIDE_U = FACE_NORMALS[:, None, :] + _AO_SIGN * FACE_TANGENT_U[:, None, :]       # (6, 4, 3)
+AO_SIDE_V = FACE_NORMALS[:, None, :] + _AO_SIGN * FACE_TANGENT_V[:, None, :]       # (6, 4, 3)
+AO_CORNER = AO_SIDE_U + AO_SIDE_V - FACE_NORMALS[:, None, :]                       # (6, 4, 3)
+
+# Enhanced AO factor for 0..8 solid voxels around a vertex (same formula as
+# Chunk.calculate_ao_enhanced).
+ENHANCED_LOOKUP = np.clip(1.0 - 0.6 * (np.arange(9) / 8.0), 0.4, 1.0)
+
+# Every value min(classic, enhanced) can take (11 levels). The packed vertex
+# format stores an index into this table; shaders/voxel_packed.vert has a copy.
+AO_LEVELS = np.unique(np.minimum.outer(AO_LOOKUP, ENHANCED_LOOKUP))
+
+
+def _strides(shape):
+    return np.array([shape[1] * shape[2], shape[2], 1], dtype=np.int64)
+
+
+def vertex_occupancy(occ):
+    """
+    Count the solid voxels among the 8 that touch every lattice vertex of the
+    unpadded region, using eight shifted-slice sums over the padded occupancy.
+    Returns an int8 array of shape (X+1, Y+1, Z+1).
+    """
+    sx, sy, sz = (n - 1 for n in occ.shape)
+    lattice = np.zeros((sx, sy, sz), dtype=np.int8)
+    for dx in (0, 1):
+        for dy in (0, 1):
+            for dz in (0, 1):
+                lattice += occ[dx:dx + sx, dy:dy + sy, dz:dz + sz]
+    return lattice
+
+
+def compute_ao(occ, coords, face):
+    """
+    Batched AO kernel shared by the six face directions. `occ` is the padded
+    int8 occupancy, `coords`/`face` describe N faces. Returns an (N, 4)
+    float64 array with min(classic, enhanced) for every vertex.
+    """
+    strides = _strides(occ.shape)
+    flat = occ.reshape(-1)
+    p = (coords + 1) @ strides                               # flat padded index of each voxel
+
+    s1 = flat[p[:, None] + (AO_SIDE_U @ strides)[face]]      # (N, 4)
+    s2 = flat[p[:, None] + (AO_SIDE_V @ strides)[face]]
+    c = flat[p[:, None] + (AO_CORNER @ strides)[face]]
+    classic = AO_LOOKUP[s1 + s2 + (c & s1 & s2)]
+
+    lattice = vertex_occupancy(occ)
+    vertex = (coords[:, None, :] + FACE_CORNERS[face]) @ _strides(lattice.shape)
+    enhanced = ENHANCED_LOOKUP[lattice.reshape(-1)[vertex]]
+
+    return np.minimum(classic, enhanced)
+
+
+def quad_split(ao, cells):
+    """
+    Decide the triangle split of every quad from its corner AO: True means
+    the 0-2 diagonal. Ties fall back to the legacy checkerboard on the global
+    voxel coordinates `cells`.
+    """
+    s1 = ao[:, 0] + ao[:, 2]
+    s2 = ao[:, 1] + ao[:, 3]
+    odd = ((cells[:, 0] + cells[:, 1] + cells[:, 2]) & 1).astype(bool)
+    return (s1 > s2) | ((s1 == s2) & odd)
+
+
+def compute_faces(padded, origin=(0, 0, 0)):
+    """
+    Find every exposed face of the interior cells of `padded` and compute its
+    per-vertex AO. Faces are ordered like the legacy mesher: by voxel (x, y, z)
+    and then by direction. `origin` is the global position of the region.
+
+    Returns a dict of arrays:
+        'coords' (N, 3) cell coordinates relative to the unpadded region
+        'face'   (N,)   direction index into FACE_DIRECTIONS
+        'block'  (N,)   block id
+        'ao'     (N, 4) final AO factor per vertex (float64)
+        'split'  (N,)   True when the quad is split along its 0-2 diagonal
+    """
+    mask = face_mask(padded)
+    cx, cy, cz, face = np.nonzero(mask)
+    coords = np.stack((cx, cy, cz), axis=1).astype(np.int64)
+    block = padded[cx + 1, cy + 1, cz + 1]
+
+    ao = compute_ao((padded > 0).astype(np.int8), coords, face)
+    split = quad_split(ao, coords + np.asarray(origin, dtype=np.int64))
+    return {'coords': coords, 'face': face, 'block': block, 'ao': ao, 'split': split}
+
+
+def greedy_merge(faces):
+    """
+    Merge adjacent coplanar faces with the same direction, block id and AO
+    into rectangles. Only faces whose four corners share one AO value are
+    merged, so interpolated shading across a merged quad stays identical;
+    the rest are kept as single quads.
+
+    Works in two vectorized passes per direction: faces are first joined
+    into runs along one tangent axis, then runs with the same start, length
+    and key are stacked along the other axis. Returns a face set like
+    `compute_faces` with an extra 'size' (N, 3) extent per quad.
+    """
+    coords, face, ao = faces['coords'], faces['face'], faces['ao']
+    n = len(face)
+    uniform = (ao == ao[:, :1]).all(axis=1)
+    _, key = np.unique(np.column_stack((faces['block'], ao[:, 0])), axis=0, return_inverse=True)
+    key = np.where(uniform, key.reshape(-1), -1 - np.arange(n))
+
+    out_coords, out_size, out_rep = [], [], []
+    for f in range(len(FACE_DIRECTIONS)):
+        sel = np.flatnonzero(face == f)
+        if sel.size == 0:
+            continue
+        n_axis = int(np.flatnonzero(FACE_NORMALS[f])[0])
+        a_axis, b_axis = (ax for ax in range(3) if ax != n_axis)
+        layer, a, b, k = coords[sel, n_axis], coords[sel, a_axis], coords[sel, b_axis], key[sel]
+
+        # Pass 1: runs along the `a` axis.
+        order = np.lexsort((a, b, layer, k))
+        layer, a, b, k, rep = layer[order], a[order], b[order], k[order], sel[order]
+        brk = np.ones(len(a), dtype=bool)
+        brk[1:] = (k[1:] != k[:-1]) | (layer[1:] != layer[:-1]) | (b[1:] != b[:-1]) | (a[1:] != a[:-1] + 1)
+        starts = np.flatnonzero(brk)
+        a_len = np.diff(np.append(starts, len(a)))
+        layer, a, b, k, rep = layer[starts], a[starts], b[starts], k[starts], rep[starts]
+
+        # Pass 2: stack identical runs along the `b` axis.
+        order = np.lexsort((b, a_len, a, layer, k))
+        layer, a, b, k, rep, a_len = layer[order], a[order], b[order], k[order], rep[order], a_len[order]
+        brk = np.ones(len(b), dtype=bool)
+        brk[1:] = ((k[1:] != k[:-1]) | (layer[1:] != layer[:-1]) | (a[1:] != a[:-1]) |
+                   (a_len[1:] != a_len[:-1]) | (b[1:] != b[:-1] + 1))
+        starts = np.flatnonzero(brk)
+        b_len = np.diff(np.append(starts, len(b)))
+
+        rect = np.empty((len(starts), 3), dtype=np.int64)
+        rect[:, n_axis], rect[:, a_axis], rect[:, b_axis] = layer[starts], a[starts], b[starts]
+        size = np.ones((len(starts), 3), dtype=np.int64)
+        size[:, a_axis], size[:, b_axis] = a_len[starts], b_len
+        out_coords.append(rect)
+        out_size.append(size)
+        out_rep.append(rep[starts])
+
+    if not out_rep:
+        return dict(faces, size=np.ones((0, 3), dtype=np.int64))
+    rep = np.concatenate(out_rep)
+    return {
+        'coords': np.concatenate(out_coords),
+        'size': np.concatenate(out_size),
+        'face': face[rep],
+        'block': faces['block'][rep],
+        'ao': ao[rep],
+        'split': faces['split'][rep],
+    }
+
+
+def make_vertices(positions, face, block, ao):
+    """
+    Build a vertex array in the configured layout (Config.VERTEX_FORMAT) from
+    per-vertex positions (M, 3), face direction index, block id and AO factor.
+    """
+    if VERTEX_FORMAT != 'packed':
+        vertices = np.zeros(len(face), dtype=data_type_vertex)
+        vertices['position'] = positions
+        vertices['normal'] = FACE_NORMALS[face]
+        vertices['block_id'] = block
+        vertices['ao'] = ao
+        return vertices
+
+    p = positions.astype(np.uint32)
+    level = np.abs(ao[:, None] - AO_LEVELS).argmin(axis=1).astype(np.uint32)
+    vertices = np.empty(len(face), dtype=data_type_vertex_packed)
+    vertices['position'] = p[:, 0] | (p[:, 1] << 10) | (p[:, 2] << 20)
+    vertices['attributes'] = block.astype(np.uint32) | (face.astype(np.uint32) << 16) | (level << 19)
+    return vertices
+
+
+def pack_vertices(vertices):
+    """Convert a float-layout (data_type_vertex) array to the configured layout."""
+    face = np.abs(vertices['normal'][:, None, :] - FACE_NORMALS).sum(axis=2).argmin(axis=1)
+    return make_vertices(vertices['position'], face, vertices['block_id'], vertices['ao'].astype(np.float64))
+
+
+def share_quad_indices(vertices, indices):
+    """
+    Rewrite an indexed quad mesh (4 vertices / 6 indices per quad, e.g. from
+    `Chunk.build_mesh_legacy`) for the shared quad index buffer: quads split
+    on the 1-3 diagonal get their corners rotated. Returns the new vertices.
+    """
+    quads = vertices.reshape(-1, 4)
+    q = indices.reshape(-1, 6)
+    rotate = q[:, 2] != q[:, 0] + 2
+    quads = quads.copy()
+    quads[rotate] = quads[rotate][:, QUAD_ROTATE_13]
+    return quads.reshape(-1)
+
+
+def emit_quads(faces, offset=(0, 0, 0), shared=SHARED_QUAD_INDICES):
+    """
+    Turn a face set from `compute_faces` (or `greedy_merge`) into
+    (vertices, indices) arrays. `offset` is added to the vertex positions
+    (chunk-local space). With `shared` the triangle split is encoded in the
+    corner order and `indices` is None (see `Mesh` and QuadIndexBuffer).
+    """
+    coords, face, ao = faces['coords'], faces['face'], faces['ao']
+    n = len(face)
+
+    corners = FACE_CORNERS[face]
+    if 'size' in faces:
+        corners = corners * faces['size'][:, None, :]
+    positions = coords[:, None, :] + np.asarray(offset, dtype=np.int64) + corners
+    if shared:
+        order = np.where(faces['split'][:, None], np.arange(4), QUAD_ROTATE_13)
+        positions = np.take_along_axis(positions, order[:, :, None], axis=1)
+        ao = np.take_along_axis(ao, order, axis=1)
+    vertices = make_vertices(positions.reshape(-1, 3), np.repeat(face, 4),
+                             np.repeat(faces['block'], 4), ao.reshape(-1))
+    if shared:
+        return vertices, None
+
+    base = (np.arange(n, dtype=np.uint32) * 4)[:, None]
+    indices = base + np.where(faces['split'][:, None], QUAD_SPLIT_02, QUAD_SPLIT_13)
+    return vertices, indices.reshape(-1).astype(np.uint32)
+
+
+def build_geometry(padded, origin=(0, 0, 0), greedy=False):
+    """
+    Mesh a whole padded region. Returns (vertices, indices), or (None, None)
+    when there is no visible face.
+    """
+    faces = compute_faces(padded, origin)
+    if len(faces['face']) == 0:
+        return None, None
+    if greedy:
+        faces = greedy_merge(faces)
+    return emit_quads(faces)
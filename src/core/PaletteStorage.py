@@ -0,0 +1,205 @@
+# src/core/PaletteStorage.py
+"""
+Palette-compressed voxel storage for one chunk.
+
+A chunk is kept in one of two forms:
+
+* packed: a palette of the block ids present plus one index per voxel,
+  bit-packed at 0/1/2/4/8/16 bits depending on the palette size (0 bits
+  means the chunk is a single block type, e.g. all air, and stores no data);
+* unpacked: a plain (size, size, size) uint32 array of block ids, the "fast
+  view" handed out through `Chunk.voxels` to the mesher, raycaster and file
+  code. While unpacked, the array is the authoritative copy and may be
+  written to directly.
+
+Single-voxel `get`/`set` work in both forms; `set` on packed data appends
+new block types to the palette and widens the indices when needed. World
+keeps a bounded LRU of unpacked chunks and packs the rest between frames
+(see `World.compact_chunks`).
+
+`share()` hands out a copy for a snapshot that shares the arrays; the first
+in-place write afterwards copies them (copy-on-write, see `WorldSnapshot`).
+"""
+import copy
+
+import numpy as np
+
+# Bits per index for a palette of n entries
+_WIDTHS = (0, 1, 2, 4, 8, 16)
+
+
+def index_bits(palette_size):
+    for bits in _WIDTHS:
+        if palette_size <= (1 << bits):
+            return bits
+    raise ValueError(f"Palette too large: {palette_size} block types in one chunk")
+
+
+def pack_indices(indices, bits):
+    """Flat uint indices -> packed array (uint8, or uint16 for 16 bits)."""
+    if bits == 0:
+        return None
+    if bits == 16:
+        return indices.astype(np.uint16)
+    if bits == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // bits
+    shifts = (np.arange(per_byte, dtype=np.uint8) * bits)
+    padded = np.zeros(-(-len(indices) // per_byte) * per_byte, dtype=np.uint8)
+    padded[:len(indices)] = indices
+    grouped = padded.reshape(-1, per_byte) << shifts
+    return np.bitwise_or.reduce(grouped, axis=1).astype(np.uint8)
+
+
+def unpack_indices(data, bits, count):
+    """Inverse of `pack_indices`; returns `count` indices as intp."""
+    if bits == 0:
+        return np.zeros(count, dtype=np.intp)
+    if bits >= 8:
+        return data.astype(np.intp)
+    per_byte = 8 // bits
+    shifts = (np.arange(per_byte, dtype=np.uint8) * bits)
+    mask = (1 << bits) - 1
+    return ((data[:, None] >> shifts) & mask).reshape(-1)[:count].astype(np.intp)
+
+
+class PaletteStorage:
+    def __init__(self, size, block_id=0):
+        self.size = size
+        self.count = size ** 3
+        self.dense = None
+        # True while a snapshot may hold these arrays: copy them before writing in place
+        self.shared = False
+        self.fill(block_id)
+
+    @property
+    def is_packed(self):
+        return self.dense is None
+
+    def share(self):
+        """Copy for a snapshot, sharing the arrays until the next in-place write to either."""
+        self.shared = True
+        return copy.copy(self)
+
+    def make_writable(self):
+        """Give this storage private arrays if a snapshot shares them."""
+        if not self.shared:
+            return
+        for name in ('dense', 'palette', 'data'):
+            array = getattr(self, name)
+            if array is not None:
+                setattr(self, name, array.copy())
+        self.shared = False
+
+    def fill(self, block_id):
+        """Set every voxel to `block_id` (leaves the storage packed, zero bits)."""
+        self.dense = None
+        self.palette = np.array([block_id], dtype=np.uint32)
+        self.bits = 0
+        self.data = None
+
+    def is_uniform(self, block_id):
+        if self.dense is not None:
+            return not (self.dense != block_id).any()
+        return self.bits == 0 and self.palette[0] == block_id
+
+    def uniform_value(self):
+        """The block id of a packed single-type chunk, else None (cheap, never unpacks)."""
+        if self.dense is None and self.bits == 0:
+            return int(self.palette[0])
+        return None
+
+    def unpacked(self):
+        """The (size, size, size) uint32 view; unpacks on first use."""
+        if self.dense is None:
+            indices = unpack_indices(self.data, self.bits, self.count)
+            self.dense = self.palette[indices].reshape(self.size, self.size, self.size)
+            self.palette = self.data = None
+            self.shared = False  # fresh array, nobody else holds it
+        return self.dense
+
+    def pack(self):
+        """Compress the unpacked array back into palette + packed indices."""
+        if self.dense is None:
+            return
+        palette, indices = np.unique(self.dense, return_inverse=True)
+        self.bits = index_bits(len(palette))
+        self.palette = palette.astype(np.uint32)
+        self.data = pack_indices(indices.reshape(-1), self.bits)
+        self.dense = None
+        self.shared = False
+
+    def read_box(self, lo, hi):
+        """
+        Block ids of the local box [lo, hi) without unpacking: packed data is
+        decoded for those cells only. Read only (a view while unpacked).
+        """
+        if self.dense is not None:
+            return self.dense[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+        shape = tuple(int(h) - int(l) for l, h in zip(lo, hi))
+        if self.bits == 0:
+            return np.full(shape, self.palette[0], dtype=np.uint32)
+        if shape == (self.size,) * 3:
+            indices = unpack_indices(self.data, self.bits, self.count)
+        else:
+            x, y, z = (np.arange(l, h) for l, h in zip(lo, hi))
+            flat = ((x[:, None, None] * self.size + y[None, :, None]) * self.size + z[None, None, :]).reshape(-1)
+            if self.bits >= 8:
+                indices = self.data[flat]
+            else:
+                per_byte = 8 // self.bits
+                shifts = ((flat % per_byte) * self.bits).astype(np.uint8)
+                indices = (self.data[flat // per_byte] >> shifts) & ((1 << self.bits) - 1)
+        return self.palette[indices].reshape(shape)
+
+    def _flat(self, x, y, z):
+        return (x * self.size + y) * self.size + z
+
+    def get(self, x, y, z):
+        if self.dense is not None:
+            return int(self.dense[x, y, z])
+        if self.bits == 0:
+            return int(self.palette[0])
+        i = self._flat(x, y, z)
+        if self.bits >= 8:
+            return int(self.palette[self.data[i]])
+        per_byte = 8 // self.bits
+        index = (int(self.data[i // per_byte]) >> ((i % per_byte) * self.bits)) & ((1 << self.bits) - 1)
+        return int(self.palette[index])
+
+    def set(self, x, y, z, block_id):
+        self.make_writable()
+        if self.dense is not None:
+            self.dense[x, y, z] = block_id
+            return
+        found = np.flatnonzero(self.palette == block_id)
+        if found.size:
+            index = int(found[0])
+        else:
+            index = len(self.palette)
+            self._widen(index_bits(index + 1))
+            self.palette = np.append(self.palette, np.uint32(block_id))
+
+        if self.bits == 0:
+            return  # single block type and it is already that one
+        i = self._flat(x, y, z)
+        if self.bits >= 8:
+            self.data[i] = index
+            return
+        per_byte = 8 // self.bits
+        shift = (i % per_byte) * self.bits
+        mask = ((1 << self.bits) - 1) << shift
+        self.data[i // per_byte] = (int(self.data[i // per_byte]) & ~mask & 0xFF) | (index << shift)
+
+    def _widen(self, bits):
+        if bits <= self.bits:
+            return
+        indices = unpack_indices(self.data, self.bits, self.count)
+        self.bits = bits
+        self.data = pack_indices(indices, bits)
+
+    @property
+    def nbytes(self):
+        if self.dense is not None:
+            return self.dense.nbytes
+        return self.palette.nbytes + (self.data.nbytes if self.data is not None else 0)
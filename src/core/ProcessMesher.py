@@ -0,0 +1,247 @@
+# src/core/ProcessMesher.py
+"""
+Multi-process chunk meshing for bulk rebuilds (loading a model, clearing the world).
+
+Python threads share one interpreter lock, so the thread pool in MeshWorker
+only overlaps the NumPy parts of meshing. For bulk rebuilds the padded voxel
+arrays of a whole batch of chunks are copied once into a
+`multiprocessing.shared_memory` block and every worker process meshes its
+chunk straight from it. Workers write their packed vertex/index buffers (and
+the slot table) into a shared memory segment of their own and return only its
+name and sizes, so no array is ever pickled.
+
+On POSIX a segment outlives its mappings until the GL thread unlinks it, so
+workers close theirs right after writing. Windows frees a segment as soon as
+its last handle closes, so there a worker keeps its output segments open until
+the GL thread reports that it has copied that batch: the `released` batch id
+sent with every task, and an idle release once every batch has drained.
+
+The pool uses the 'spawn' start method: the GL process already runs the
+MeshWorker threads, and forking a multithreaded process is unsafe.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.utils.Config import VERTEX_DTYPE
+from src.core.MeshWorker import build_chunk_mesh
+from src.core.SlotMesh import SlotMesh, slot_table_dtype
+
+# Windows only: output segments created by this worker process, (batch, SharedMemory)
+_held_segments = []
+_HOLD_SEGMENTS = os.name == 'nt'
+# How long an idle-release task keeps its worker busy, so each worker takes one
+_IDLE_RELEASE_HOLD = 0.05
+
+
+def _release_segments(released):
+    keep = []
+    for batch, segment in _held_segments:
+        if batch <= released:
+            segment.close()
+        else:
+            keep.append((batch, segment))
+    _held_segments[:] = keep
+
+
+def _release_idle(released):
+    """Worker task sent when the pool drains: free the held segments."""
+    _release_segments(released)
+    time.sleep(_IDLE_RELEASE_HOLD)
+
+
+def _mesh_shared_chunk(batch, released, input_name, index, size, origin, greedy):
+    """Worker entry point: mesh chunk `index` of the shared input block."""
+    _release_segments(released)
+
+    shape = (size + 2,) * 3
+    block = shared_memory.SharedMemory(name=input_name)
+    try:
+        padded = np.ndarray(shape, dtype=np.uint32, buffer=block.buf,
+                            offset=index * int(np.prod(shape)) * 4)
+        result = build_chunk_mesh(padded, origin, size, greedy)
+        del padded
+    finally:
+        block.close()
+
+    header = {'face_count': result['face_count'], 'quad_count': result['quad_count'],
+              'segment': None, 'vertex_count': 0, 'index_count': None, 'slot_count': None}
+    if result['vertices'] is None:
+        return header
+
+    parts = [result['vertices']]
+    if result['indices'] is not None:
+        parts.append(result['indices'])
+        header['index_count'] = len(result['indices'])
+    if result['slots'] is not None:
+        parts.append(result['slots'].slot_table)
+        header['slot_count'] = result['slots'].slot_count
+    segment = shared_memory.SharedMemory(create=True, size=sum(p.nbytes for p in parts))
+    offset = 0
+    for part in parts:
+        segment.buf[offset:offset + part.nbytes] = part.reshape(-1).view(np.uint8)
+        offset += part.nbytes
+    if _HOLD_SEGMENTS:
+        _held_segments.append((batch, segment))
+    else:
+        segment.close()  # the name stays valid until the GL thread unlinks it
+
+    header.update(segment=segment.name, vertex_count=len(result['vertices']))
+    return header
+
+
+def _read_segment(header, size):
+    """Copy a worker's output segment into a `build_chunk_mesh`-style result and free it."""
+    result = {'face_count': header['face_count'], 'quad_count': header['quad_count'],
+              'slots': None, 'vertices': None, 'indices': None}
+    if header['segment'] is None:
+        return result
+
+    segment = shared_memory.SharedMemory(name=header['segment'])
+    try:
+        offset = 0
+        vertices = np.frombuffer(segment.buf, dtype=VERTEX_DTYPE, count=header['vertex_count'], offset=offset).copy()
+        offset += vertices.nbytes
+        indices = None  # shared quad index buffer
+        if header['index_count'] is not None:
+            indices = np.frombuffer(segment.buf, dtype=np.uint32, count=header['index_count'], offset=offset).copy()
+            offset += indices.nbytes
+        if header['slot_count'] is not None:
+            table = np.frombuffer(segment.buf, dtype=slot_table_dtype(size), count=size ** 3 * 6, offset=offset).copy()
+            result['slots'] = SlotMesh.from_arrays(size, vertices, indices, table.reshape(size, size, size, 6),
+                                                   header['slot_count'])
+    finally:
+        segment.close()
+        segment.unlink()
+    result['vertices'], result['indices'] = vertices, indices
+    return result
+
+
+class ProcessMeshPool:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None  # started on first use; spawning processes is not free
+        self.results = queue.Queue()
+        self.next_batch = 0
+        self.released = -1
+        self.batches = {}  # batch id -> [input SharedMemory, jobs still pending]
+        # The GL thread and a background load may both submit batches
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def submit_batch(self, jobs):
+        """
+        Mesh many chunks at once. `jobs` is a list of (chunk, version, padded,
+        origin, greedy); the padded arrays are copied into one shared block.
+        Returns the futures in the same order; results arrive through poll().
+        """
+        if not jobs:
+            return []
+        batch, futures = self._start_batch(jobs[0][0].size, [(padded, origin, greedy)
+                                                            for _, _, padded, origin, greedy in jobs])
+        for (chunk, version, *_), future in zip(jobs, futures):
+            future.add_done_callback(lambda f, c=chunk, v=version, b=batch: self.results.put((c, v, b, f)))
+        return futures
+
+    def mesh_batch(self, size, jobs):
+        """
+        Blocking variant of submit_batch for worker threads (background loads):
+        meshes the (padded, origin, greedy) `jobs` and returns their
+        `build_chunk_mesh`-style results in the same order.
+        """
+        if not jobs:
+            return []
+        batch, futures = self._start_batch(size, jobs)
+        results, error = [], None
+        for future in futures:
+            result = None
+            try:
+                result = _read_segment(future.result(), size)
+            except Exception as e:
+                error = error or e
+            finally:
+                self._job_done(batch)
+            results.append(result)
+        if error is not None:
+            raise error
+        return results
+
+    def _start_batch(self, size, jobs):
+        """Copy the padded arrays of `jobs` into one shared block and submit a task per chunk."""
+        cell_count = (size + 2) ** 3
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+            block = shared_memory.SharedMemory(create=True, size=len(jobs) * cell_count * 4)
+            stacked = np.ndarray((len(jobs), size + 2, size + 2, size + 2), dtype=np.uint32, buffer=block.buf)
+            for i, (padded, _, _) in enumerate(jobs):
+                stacked[i] = padded
+            del stacked
+
+            batch = self.next_batch
+            self.next_batch += 1
+            self.batches[batch] = [block, len(jobs)]
+            futures = [self.executor.submit(_mesh_shared_chunk, batch, self.released, block.name, i,
+                                            size, tuple(int(c) for c in origin), greedy)
+                       for i, (_, origin, greedy) in enumerate(jobs)]
+        return batch, futures
+
+    def poll(self):
+        """Yield (chunk, version, result) for every finished job, like MeshWorkerPool.poll."""
+        while True:
+            try:
+                chunk, version, batch, future = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if future.cancelled():
+                self._job_done(batch)
+                continue
+            try:
+                result = _read_segment(future.result(), chunk.size)
+            except Exception as e:
+                print(f"Error meshing chunk {chunk.position} in worker process: {e}")
+                chunk.mesh_job = None
+                chunk.world.mark_dirty(chunk)
+                continue
+            finally:
+                # Only after the copy: this may let workers free the batch's segments
+                self._job_done(batch)
+            yield chunk, version, result
+
+    def _job_done(self, batch):
+        with self.lock:
+            entry = self.batches.get(batch)
+            if entry is None:
+                return  # released by shutdown()
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            entry[0].close()
+            entry[0].unlink()
+            del self.batches[batch]
+            # Workers may free output segments of every batch older than the oldest open one
+            self.released = (min(self.batches) if self.batches else self.next_batch) - 1
+            if not self.batches and _HOLD_SEGMENTS and self.executor is not None:
+                # Nothing else will reach the workers for a while: release now
+                for _ in range(self.workers):
+                    self.executor.submit(_release_idle, self.released)
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            for block, _ in self.batches.values():
+                block.close()
+                block.unlink()
+            self.batches.clear()
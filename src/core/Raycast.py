@@ -2,7 +2,7 @@
 import numpy as np
 
 class Raycast:
-    def __init__(self, world, origin, direction, max_distance=50.0):
+    def __init__(self, world, origin, direction, max_distance=None):
         self.world = world
         self.ray_origin = origin.copy()
         self.ray_direction = direction.copy()
@@ -12,7 +12,10 @@ class Raycast:
         # Evitar división por cero
         if abs(self.ray_direction[1]) < epsilon:
             self.ray_direction[1] = np.sign(self.ray_direction[1]) * epsilon if self.ray_direction[1] != 0 else epsilon
-            
+
+        # Por defecto el alcance escala con el mundo (el cubo entero visto desde fuera)
+        if max_distance is None:
+            max_distance = max(50.0, 2.0 * world.total_size)
         self.max_distance = max_distance
         self.voxel_pos = np.floor(self.ray_origin).astype(int)
         self.step = np.sign(self.ray_direction).astype(int)
@@ -25,29 +28,85 @@ class Raycast:
         else: self.side_dist_y = (self.voxel_pos[1] + 1 - self.ray_origin[1]) * self.delta_dist[1]
         if self.ray_direction[2] < 0: self.side_dist_z = (self.ray_origin[2] - self.voxel_pos[2]) * self.delta_dist[2]
         else: self.side_dist_z = (self.voxel_pos[2] + 1 - self.ray_origin[2]) * self.delta_dist[2]
-            
+
+    def clip_to_world(self):
+        """
+        Intersect the ray with the world box [0, total_size]^3. Returns
+        (t_enter, t_exit, enter_axis) in units of `ray_direction`, or None when
+        the ray misses the box or leaves it behind the origin.
+        """
+        size = float(self.world.total_size)
+        t_enter, t_exit, enter_axis = -np.inf, np.inf, -1
+        for axis in range(3):
+            o, d = float(self.ray_origin[axis]), float(self.ray_direction[axis])
+            if d == 0.0:
+                if not (0.0 <= o <= size):
+                    return None
+                continue
+            t0, t1 = (0.0 - o) / d, (size - o) / d
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > t_enter:
+                t_enter, enter_axis = t0, axis
+            t_exit = min(t_exit, t1)
+        if t_enter > t_exit or t_exit < 0.0:
+            return None
+        return t_enter, t_exit, enter_axis
+
     def step_forward(self):
         last_voxel_pos = self.voxel_pos.copy()
 
-        # Bucle principal del raycast
-        while np.linalg.norm(self.voxel_pos - self.ray_origin) < self.max_distance:
-            if self.side_dist_x < self.side_dist_y and self.side_dist_x < self.side_dist_z:
-                self.side_dist_x += self.delta_dist[0]
-                self.voxel_pos[0] += self.step[0]
-                last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[0] -= self.step[0]
-            elif self.side_dist_y < self.side_dist_z:
-                self.side_dist_y += self.delta_dist[1]
-                self.voxel_pos[1] += self.step[1]
-                last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[1] -= self.step[1]
-            else:
-                self.side_dist_z += self.delta_dist[2]
-                self.voxel_pos[2] += self.step[2]
-                last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[2] -= self.step[2]
-            
-            # Comprobación de colisión con un bloque existente
-            if self.world.is_solid(self.voxel_pos[0], self.voxel_pos[1], self.voxel_pos[2]):
-                return tuple(self.voxel_pos), tuple(last_voxel_pos)
-        
+        # Solo se recorren las celdas dentro del mundo: si el origen está fuera,
+        # el DDA empieza en el punto de entrada en vez de atravesar el vacío.
+        clip = self.clip_to_world()
+        if clip is not None:
+            t_enter, t_exit, enter_axis = clip
+            t_limit = min(t_exit, self.max_distance / float(np.linalg.norm(self.ray_direction)))
+            if t_enter > 0.0:
+                if t_enter <= t_limit:
+                    hit = self._enter_world(t_enter, enter_axis)
+                    if hit is not None:
+                        return hit
+                else:
+                    t_limit = -1.0  # the world is out of reach
+
+            size, chunks = self.world.base_chunk_size, self.world.chunks
+
+            # Bucle principal del raycast
+            while min(self.side_dist_x, self.side_dist_y, self.side_dist_z) <= t_limit:
+                # Pirámide de ocupación: los chunks vacíos (o sin asignar) y, dentro
+                # de los demás, los bricks vacíos se cruzan de un salto
+                vx, vy, vz = int(self.voxel_pos[0]), int(self.voxel_pos[1]), int(self.voxel_pos[2])
+                chunk = chunks.get((vx // size, vy // size, vz // size))
+                if chunk is None or chunk.solid_count == 0:
+                    box = size
+                else:
+                    box = chunk.brick_size
+                    bricks = chunk.brick_counts
+                    if box == size or bricks[vx % size // box, vy % size // box, vz % size // box]:
+                        box = 0
+                if box:
+                    lo = [vx - vx % box, vy - vy % box, vz - vz % box]
+                    last_voxel_pos = self._skip_box(lo, [c + box - 1 for c in lo], t_limit)
+                    if last_voxel_pos is None:
+                        break
+                elif self.side_dist_x < self.side_dist_y and self.side_dist_x < self.side_dist_z:
+                    self.side_dist_x += self.delta_dist[0]
+                    self.voxel_pos[0] += self.step[0]
+                    last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[0] -= self.step[0]
+                elif self.side_dist_y < self.side_dist_z:
+                    self.side_dist_y += self.delta_dist[1]
+                    self.voxel_pos[1] += self.step[1]
+                    last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[1] -= self.step[1]
+                else:
+                    self.side_dist_z += self.delta_dist[2]
+                    self.voxel_pos[2] += self.step[2]
+                    last_voxel_pos = self.voxel_pos.copy(); last_voxel_pos[2] -= self.step[2]
+
+                # Comprobación de colisión con un bloque existente
+                if self.world.is_solid(self.voxel_pos[0], self.voxel_pos[1], self.voxel_pos[2]):
+                    return tuple(self.voxel_pos), tuple(last_voxel_pos)
+
         # --- INICIO DE LA CORRECCIÓN ---
         # Si el bucle termina sin colisión, intentamos intersectar el rayo
         # con el volumen de la cuadrícula (AABB) para permitir colocar
@@ -137,4 +196,66 @@ class Raycast:
 
             return hit_pos, place_pos
         # Si no hay colisión ni intersección con el volumen del grid, no devolver nada.
-        return None, None
\ No newline at end of file
+        return None, None
+
+    def _skip_box(self, lo, hi, t_limit):
+        """
+        Advance the DDA out of the cell box [lo, hi] (inclusive) that holds
+        the current voxel, landing on the same cell the step loop would reach
+        after leaving it. Returns the voxel before that one, or None (state
+        untouched) when the ray leaves the box beyond `t_limit`.
+        """
+        sides = [self.side_dist_x, self.side_dist_y, self.side_dist_z]
+        exits = []
+        for axis in range(3):
+            if self.step[axis] == 0:
+                exits.append(np.inf)
+                continue
+            edge = hi[axis] if self.step[axis] > 0 else lo[axis]
+            exits.append(sides[axis] + abs(edge - int(self.voxel_pos[axis])) * self.delta_dist[axis])
+        # Mismo desempate que el bucle principal
+        if exits[0] < exits[1] and exits[0] < exits[2]:
+            exit_axis = 0
+        elif exits[1] < exits[2]:
+            exit_axis = 1
+        else:
+            exit_axis = 2
+        t = exits[exit_axis]
+        if t > t_limit:
+            return None
+
+        for axis in range(3):
+            if axis == exit_axis:
+                crossings = int(round((t - sides[axis]) / self.delta_dist[axis])) + 1
+            elif self.step[axis] == 0:
+                continue
+            else:
+                # Boundaries of this axis crossed before the exit one
+                crossings = max(0, int(np.ceil((t - sides[axis]) / self.delta_dist[axis])))
+            self.voxel_pos[axis] += self.step[axis] * crossings
+            sides[axis] += crossings * self.delta_dist[axis]
+        self.side_dist_x, self.side_dist_y, self.side_dist_z = sides
+        previous = self.voxel_pos.copy()
+        previous[exit_axis] -= self.step[exit_axis]
+        return previous
+
+    def _enter_world(self, t_enter, enter_axis):
+        """
+        Move the DDA to the first voxel inside the world along the ray and
+        test it (the main loop only tests voxels it steps into). Returns a
+        (hit, previous) pair or None.
+        """
+        last = self.world.total_size - 1
+        point = self.ray_origin + self.ray_direction * t_enter
+        voxel = np.clip(np.floor(point).astype(int), 0, last)
+        voxel[enter_axis] = 0 if self.step[enter_axis] > 0 else last
+        self.voxel_pos = voxel
+        for axis, name in enumerate(('side_dist_x', 'side_dist_y', 'side_dist_z')):
+            boundary = voxel[axis] + (1 if self.ray_direction[axis] >= 0 else 0)
+            setattr(self, name, (boundary - self.ray_origin[axis]) / self.ray_direction[axis]
+                    if self.ray_direction[axis] != 0 else np.inf)
+        if self.world.is_solid(voxel[0], voxel[1], voxel[2]):
+            previous = voxel.copy()
+            previous[enter_axis] -= self.step[enter_axis]
+            return tuple(voxel), tuple(previous)
+        return None
@@ -7,7 +7,9 @@ from OpenGL.GL import (
 )
 from OpenGL.GL import glBindVertexArray
 
+from src.utils.Config import CHUNK_SIZE, WORLD_SIZE_IN_CHUNKS
 from src.core.World import World
+from src.core.BufferPool import buffer_pool, quad_indices
 from src.ui.Grid import Grid
 from src.core.Sun import Sun
 from src.ui.Highlight import Highlight
@@ -15,11 +17,8 @@ from src.ui.PivotGizmo import PivotGizmo
 
 class Scene:
     def __init__(self, block_type_enum, block_colors_dict):
-        self.world_size = 3
-        chunk_dimension = 32
-        world_coord_size = chunk_dimension * self.world_size
-
-        self.world = World(chunk_size=chunk_dimension, world_size_in_chunks=self.world_size)
+        self.world = World(chunk_size=CHUNK_SIZE, world_size_in_chunks=WORLD_SIZE_IN_CHUNKS)
+        world_coord_size = self.world.total_size
         self.grid = Grid(width=world_coord_size, depth=world_coord_size, height=world_coord_size)
         self.sun = Sun()
         self.highlighter = Highlight()
@@ -32,6 +31,9 @@ class Scene:
                 self.block_palette_array[int(block_type)] = color
 
     def render(self, projection_matrix, view_matrix, voxel_shader, hit_voxel_pos, hit_voxel_normal):
+        # The world may have been resized (UI or loading a larger model); the grid only rescales
+        size = self.world.total_size
+        self.grid.set_size(size, size, size)
         self.grid.render(projection_matrix, view_matrix)
         
         # Render Voxel World
@@ -65,7 +67,10 @@ class Scene:
             pass
 
     def destroy(self):
+        self.world.shutdown()
         self.grid.destroy()
         for chunk in self.world.chunks.values():
             if chunk.mesh:
-                chunk.mesh.destroy()
\ No newline at end of file
+                chunk.mesh.destroy()
+        buffer_pool.clear()
+        quad_indices.destroy()
\ No newline at end of file
@@ -0,0 +1,140 @@
+# src/core/SlotMesh.py
+"""
+CPU side of a chunk mesh that can be patched in place.
+
+Every visible face owns one quad slot (4 vertices, 6 indices) and
+`slot_table[x, y, z, face]` remembers which slot it uses. Re-meshing a small
+box only frees the slots of the faces inside it and writes the new faces into
+free slots, so the GPU copy can be updated with glBufferSubData over the
+touched slot range instead of re-uploading the whole chunk.
+
+With Config.SHARED_QUAD_INDICES there is no per-mesh index array
+(`indices` is None): slot s is always drawn by the shared quad index buffer.
+"""
+import numpy as np
+from src.utils.Config import VERTEX_DTYPE, SHARED_QUAD_INDICES
+from src.core.Mesher import emit_quads
+
+
+def slot_table_dtype(size):
+    """
+    Smallest signed type for the slot table of a `size`^3 chunk. Freed slots
+    are reused before new ones, so there are never more than size^3 * 6
+    slots (int16 for 16^3 chunks, half the memory of int32).
+    """
+    return np.dtype(np.int16) if size ** 3 * 6 <= np.iinfo(np.int16).max else np.dtype(np.int32)
+
+
+class SlotMesh:
+    MIN_CAPACITY = 256
+
+    def __init__(self, size, capacity=0):
+        self.size = size
+        self.capacity = 0
+        self.vertices = np.zeros(0, dtype=VERTEX_DTYPE)
+        self.indices = None if SHARED_QUAD_INDICES else np.zeros(0, dtype=np.uint32)
+        self.slot_table = np.full((size, size, size, 6), -1, dtype=slot_table_dtype(size))
+        self.free_slots = []
+        self.slot_count = 0  # high-water mark: slots [0, slot_count) are drawn
+
+        self.dirty_first = None
+        self.dirty_last = 0
+        self.grown = False
+        self._grow(max(self.MIN_CAPACITY, capacity))
+
+    @classmethod
+    def from_arrays(cls, size, vertices, indices, slot_table, slot_count):
+        """Rebuild a SlotMesh from arrays produced elsewhere (e.g. another process)."""
+        slots = cls.__new__(cls)
+        slots.size = size
+        slots.capacity = len(vertices) // 4
+        slots.vertices, slots.indices, slots.slot_table = vertices, indices, slot_table
+        slots.free_slots = []
+        slots.slot_count = slot_count
+        slots.dirty_first, slots.dirty_last, slots.grown = None, 0, False
+        return slots
+
+    def copy(self):
+        slots = SlotMesh.from_arrays(self.size, self.vertices.copy(),
+                                     None if self.indices is None else self.indices.copy(),
+                                     self.slot_table.copy(), self.slot_count)
+        slots.free_slots = list(self.free_slots)
+        return slots
+
+    @property
+    def quad_count(self):
+        return self.slot_count - len(self.free_slots)
+
+    @property
+    def draw_count(self):
+        """Number of indices to draw. Freed slots are degenerate quads."""
+        return self.slot_count * 6
+
+    def _grow(self, capacity):
+        capacity = max(capacity, self.capacity * 2)
+        vertices = np.zeros(capacity * 4, dtype=VERTEX_DTYPE)
+        vertices[:len(self.vertices)] = self.vertices
+        if self.indices is not None:
+            indices = np.zeros(capacity * 6, dtype=np.uint32)
+            indices[:len(self.indices)] = self.indices
+            self.indices = indices
+        self.vertices, self.capacity = vertices, capacity
+        self.grown = True
+
+    def _allocate(self, n):
+        reused = self.free_slots[-n:] if n else []
+        del self.free_slots[len(self.free_slots) - len(reused):]
+        fresh = n - len(reused)
+        if self.slot_count + fresh > self.capacity:
+            self._grow(self.slot_count + fresh)
+        slots = np.concatenate((np.array(reused, dtype=np.int64),
+                                np.arange(self.slot_count, self.slot_count + fresh, dtype=np.int64)))
+        self.slot_count += fresh
+        return slots
+
+    def _touch(self, slots):
+        if slots.size == 0:
+            return
+        first, last = int(slots.min()), int(slots.max()) + 1
+        self.dirty_first = first if self.dirty_first is None else min(self.dirty_first, first)
+        self.dirty_last = max(self.dirty_last, last)
+
+    def replace_region(self, lo, hi, faces):
+        """
+        Drop every quad of the cells in the local box [lo, hi) and insert
+        `faces` (a face set from `Mesher.compute_faces` whose coordinates are
+        relative to `lo`).
+        """
+        box = self.slot_table[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+        old = box[box >= 0].astype(np.int64)
+        box[...] = -1
+        if old.size:
+            quads = self.vertices.reshape(-1, 4)
+            quads[old] = np.zeros(4, dtype=VERTEX_DTYPE)
+            self.free_slots.extend(old.tolist())
+            self._touch(old)
+
+        n = len(faces['face'])
+        if n == 0:
+            return
+        slots = self._allocate(n)
+        vertices, indices = emit_quads(faces, offset=lo, shared=self.indices is None)
+        self.vertices.reshape(-1, 4)[slots] = vertices.reshape(-1, 4)
+        if indices is not None:
+            # emit_quads numbers quads 0..n-1; rebase every quad onto its slot
+            quad_indices = indices.reshape(-1, 6) - (np.arange(n, dtype=np.uint32) * 4)[:, None]
+            self.indices.reshape(-1, 6)[slots] = quad_indices + (slots.astype(np.uint32) * 4)[:, None]
+        cells = faces['coords'] + np.asarray(lo, dtype=np.int64)
+        self.slot_table[cells[:, 0], cells[:, 1], cells[:, 2], faces['face']] = slots
+        self._touch(slots)
+
+    def take_dirty(self):
+        """
+        Return (first_slot, last_slot, grown) for the changes since the last
+        call and reset the tracking. When `grown` is True the arrays were
+        reallocated and must be uploaded in full.
+        """
+        first = self.dirty_first if self.dirty_first is not None else 0
+        result = (first, max(first, self.dirty_last), self.grown)
+        self.dirty_first, self.dirty_last, self.grown = None, 0, False
+        return result
@@ -1,37 +1,118 @@
 # World.py
 import numpy as np
+from itertools import chain
+from collections import OrderedDict
+from src.utils.Config import (MESHER_ENGINE, GREEDY_MESHING, PATCH_EDIT_LIMIT, PATCH_REGION_LIMIT, MESH_WORKERS,
+                              PROCESS_MESH_WORKERS,
+                              MESH_CACHE_BYTES, UNPACKED_CHUNK_LIMIT, LOAD_MESH_BATCH_BYTES, INSTALL_UPLOAD_BYTES)
+from src.core.MeshWorker import MeshWorkerPool, build_chunk_mesh, empty_mesh_result
+from src.core.ProcessMesher import ProcessMeshPool
+from src.core.MeshCache import MeshCache
+from src.core.PaletteStorage import PaletteStorage
 
 class World:
-    def __init__(self, chunk_size=32, world_size_in_chunks=2):
+    def __init__(self, chunk_size=32, world_size_in_chunks=2, headless=False):
         self.base_chunk_size = chunk_size
         self.world_size_in_chunks = world_size_in_chunks
+        # Sin contexto de GL (benchmarks): las mallas se quedan en la CPU
+        self.headless = headless
 
         # Total world size in voxels per axis
         self.total_size = self.base_chunk_size * self.world_size_in_chunks
 
         self.chunks = {}
         self.dirty_chunks = set()
+        # chunk -> local positions edited since its last rebuild. Dirty chunks
+        # without an entry need a full rebuild.
+        self.pending_edits = {}
+        # chunk -> local box (lo, hi) holding every edit since its last rebuild
+        # (may reach one voxel outside the chunk for edits in a neighbour).
+        # Dirty chunks without an entry need a full rebuild.
+        self.dirty_regions = {}
+        # Bumped on every edit; snapshots record the version they were taken at
+        self.version = 0
+        # Flat local index of every cell of a chunk; sliced to get the indices of a sub-box (bulk edits)
+        self._local_index = np.arange(chunk_size ** 3, dtype=np.intp).reshape(chunk_size, chunk_size, chunk_size)
+        # Background mesh builders; the GL thread only uploads their results
+        self.mesh_workers = MeshWorkerPool(MESH_WORKERS)
+        # Multi-process mesher for bulk rebuilds (see rebuild_all)
+        self.process_mesher = ProcessMeshPool(PROCESS_MESH_WORKERS)
+        # Finished CPU meshes by voxel content, so undo/redo and reloads skip remeshing
+        self.mesh_cache = MeshCache(MESH_CACHE_BYTES)
+        # Chunks whose voxels are unpacked (uint32), least recently used first
+        self.unpacked_chunks = OrderedDict()
+        self.unpacked_limit = UNPACKED_CHUNK_LIMIT
+        # Mesher used by Chunk.build_mesh: 'vectorized' or 'legacy'
+        self.mesher = MESHER_ENGINE
+        self.greedy_meshing = GREEDY_MESHING
+        # Loaded chunks waiting for their meshes to reach the GPU (see begin_install)
+        self.pending_install = None
 
-        # Lazy import to avoid circulars at module import time
-        from src.core.Chunk import Chunk
-        full_chunk = Chunk(self, (0, 0), self.total_size)
-        self.chunks[(0, 0)] = full_chunk
-        self.dirty_chunks.add(full_chunk)
+        # Chunks are allocated lazily, when the first non-air voxel is written
+        # into them (see get_or_create_chunk), so large empty worlds cost nothing.
 
         # Default pivot: bottom-center of the world in voxel coordinates
         world_coord_size = self.total_size
         self.pivot = (world_coord_size // 2, 0, world_coord_size // 2)
         
     def get_local_pos(self, x, y, z):
-        """Convierte coordenadas globales a (chunk_pos, local_pos).
+        """Convierte coordenadas globales a (chunk_pos, local_pos)."""
+        lx, ly, lz = int(x), int(y), int(z)
+        size = self.base_chunk_size
+        chunk_pos = (lx // size, ly // size, lz // size)
+        return (chunk_pos, (lx % size, ly % size, lz % size))
+
+    def in_bounds(self, x, y, z):
+        return 0 <= x < self.total_size and 0 <= y < self.total_size and 0 <= z < self.total_size
+
+    def get_or_create_chunk(self, chunk_pos):
+        """ Devuelve el chunk en `chunk_pos`, creándolo (vacío) si aún no existe. """
+        chunk = self.chunks.get(chunk_pos)
+        if chunk is None:
+            # Lazy import to avoid circulars at module import time
+            from src.core.Chunk import Chunk
+            chunk = Chunk(self, chunk_pos, self.base_chunk_size)
+            self.chunks[chunk_pos] = chunk
+            # A new chunk is about to be written, usually many times: start it unpacked
+            chunk.voxels
+        return chunk
 
-        Since the world is now represented as a single large chunk located at
-        (0,0) with size == total_size, we return chunk_pos (0,0) and local_pos
-        equal to the global coordinates (assuming they are in-bounds).
+    def _release_chunk(self, chunk):
+        """ Libera un chunk (y su malla); sus vóxeles pasan a ser aire. """
+        if self.chunks.get(chunk.position) is chunk:
+            del self.chunks[chunk.position]
+        self.dirty_chunks.discard(chunk)
+        self.pending_edits.pop(chunk, None)
+        self.dirty_regions.pop(chunk, None)
+        self.unpacked_chunks.pop(chunk, None)
+        # Any rebuild still in flight for it is dropped as stale
+        chunk.version += 1
+        self.version += 1
+        if chunk.mesh:
+            chunk.mesh.destroy()
+            chunk.mesh = None
+
+    def clear(self):
+        """ Vacía el mundo liberando todos los chunks. """
+        for chunk in list(self.chunks.values()):
+            self._release_chunk(chunk)
+
+    def resize(self, world_size_in_chunks):
         """
-        # Clamp/normalize to integers
-        lx, ly, lz = int(x), int(y), int(z)
-        return ((0, 0), (lx, ly, lz))
+        Cambia el tamaño del mundo (en chunks por eje). Al encoger se liberan
+        los chunks que quedan fuera y se rehacen los del nuevo borde, cuyo
+        halo ya no ve a sus antiguos vecinos.
+        """
+        n = max(1, int(world_size_in_chunks))
+        shrinking = n < self.world_size_in_chunks
+        self.world_size_in_chunks = n
+        self.total_size = self.base_chunk_size * n
+        for position, chunk in list(self.chunks.items()):
+            if max(position) >= n:
+                self._release_chunk(chunk)
+            elif shrinking and max(position) == n - 1:
+                self.mark_dirty(chunk)
+        self.pivot = tuple(min(max(int(c), 0), self.total_size - 1) for c in self.pivot)
 
     def is_solid(self, x, y, z):
         """ Comprueba si un bloque es sólido en coordenadas globales. """
@@ -45,37 +126,623 @@ class World:
             return False
         return self.chunks[chunk_pos].is_solid(local_pos[0], local_pos[1], local_pos[2])
 
-    def set_voxel(self, x, y, z, block_type):
-        """ Coloca un bloque y marca los chunks afectados como 'sucios'. """
+    def get_region(self, x0, y0, z0, x1, y1, z1):
+        """
+        Return the block ids of the global box [x0,x1) x [y0,y1) x [z0,z1)
+        as a uint32 array. Cells outside the world are returned as air.
+        """
+        return self._read_region(self._chunk_storage, self.total_size, x0, y0, z0, x1, y1, z1)
+
+    def _chunk_storage(self, chunk_pos):
+        chunk = self.chunks.get(chunk_pos)
+        return chunk.storage if chunk is not None else None
+
+    def _read_region(self, storage_at, total_size, x0, y0, z0, x1, y1, z1):
+        """
+        get_region over the storages given by `storage_at(chunk_pos)` (None
+        for all-air chunks) in a world of `total_size` voxels per axis, so
+        chunks that are not installed yet can be read too (mesh_prepared_chunks).
+        """
+        region = np.zeros((x1 - x0, y1 - y0, z1 - z0), dtype=np.uint32)
+        size = self.base_chunk_size
+        for cx in range(max(x0, 0) // size, (min(x1, total_size) - 1) // size + 1):
+            for cy in range(max(y0, 0) // size, (min(y1, total_size) - 1) // size + 1):
+                for cz in range(max(z0, 0) // size, (min(z1, total_size) - 1) // size + 1):
+                    storage = storage_at((cx, cy, cz))
+                    if storage is None:
+                        continue
+                    ox, oy, oz = cx * size, cy * size, cz * size
+                    lo = (max(x0, ox), max(y0, oy), max(z0, oz))
+                    hi = (min(x1, ox + size), min(y1, oy + size), min(z1, oz + size))
+                    # Read through the palette: a packed chunk stays packed (bulk rebuilds
+                    # would otherwise unpack every chunk past UNPACKED_CHUNK_LIMIT)
+                    region[lo[0] - x0:hi[0] - x0, lo[1] - y0:hi[1] - y0, lo[2] - z0:hi[2] - z0] = \
+                        storage.read_box((lo[0] - ox, lo[1] - oy, lo[2] - oz), (hi[0] - ox, hi[1] - oy, hi[2] - oz))
+        return region
+
+    @staticmethod
+    def _block_id(block_type):
         # Accept either an Enum-like block_type with a `.value` attribute or a plain int
         try:
-            block_id = block_type.value if hasattr(block_type, 'value') else int(block_type)
+            return block_type.value if hasattr(block_type, 'value') else int(block_type)
         except Exception:
             # Fallback: try to coerce to int, else default to 0 (Air)
             try:
-                block_id = int(block_type)
+                return int(block_type)
             except Exception:
-                block_id = 0
+                return 0
 
-        chunk_pos, local_pos = self.get_local_pos(x, y, z)
+    def set_voxel(self, x, y, z, block_type):
+        """ Coloca un bloque y marca los chunks afectados como 'sucios'. """
+        block_id = self._block_id(block_type)
 
-        if chunk_pos not in self.chunks:
+        if not self.in_bounds(x, y, z):
             return
+        chunk_pos, local_pos = self.get_local_pos(x, y, z)
 
-        chunk = self.chunks[chunk_pos]
+        chunk = self.chunks.get(chunk_pos)
+        if chunk is None:
+            if block_id == 0:
+                return  # air over an unallocated (all-air) chunk
+            chunk = self.get_or_create_chunk(chunk_pos)
+        lx, ly, lz = local_pos
+        prev_id = chunk.get_voxel(lx, ly, lz)
+        if prev_id == block_id:
+            return
 
         # Ensure we pass a numeric block id into the chunk (uint array)
-        chunk.set_voxel(local_pos[0], local_pos[1], local_pos[2], block_id)
+        chunk.set_voxel(lx, ly, lz, block_id)
+        self._mark_voxel_edited(chunk, local_pos, (prev_id > 0) != (block_id > 0))
+
+    # --- Ediciones masivas ---
+    #
+    # Todas acaban en `_write_chunk`: una sola asignación por chunk afectado
+    # sobre su array plano, y cada chunk se marca sucio una sola vez. Devuelven
+    # una acción {'type': 'bulk', 'changes': [...]} para ActionHistory (o None
+    # si nada cambió) con, por chunk, los índices locales planos modificados y
+    # sus valores anterior y nuevo.
+
+    def set_voxels(self, coords, block_ids):
+        """
+        Write `block_ids` (one id, or one per row) at the (N, 3) global
+        coordinates `coords`. Coordinates outside the world are ignored.
+        """
+        ids = np.asarray(self._block_id(block_ids) if np.ndim(block_ids) == 0 else block_ids, dtype=np.uint32)
+        inside, groups = self._group_by_chunk(coords)
+        if ids.ndim:
+            ids = ids[inside]
+        changes = []
+        for chunk_pos, group, flat in groups:
+            change = self._write_chunk(chunk_pos, flat, ids[group] if ids.ndim else ids)
+            if change is not None:
+                changes.append(change)
+        return self._bulk_action(changes)
+
+    def _group_by_chunk(self, coords, world_size_in_chunks=None):
+        """
+        Split (N, 3) global coordinates by chunk. Returns (inside, groups):
+        the mask of the rows inside the world (of `world_size_in_chunks`
+        chunks per axis, by default the current size) and, per chunk, a tuple
+        (chunk_pos, rows, flat_local_indices) with `rows` indexing coords[inside].
+        """
+        size = self.base_chunk_size
+        n = self.world_size_in_chunks if world_size_in_chunks is None else world_size_in_chunks
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        inside = ((coords >= 0) & (coords < size * n)).all(axis=1)
+        coords = coords[inside]
+        if not len(coords):
+            return inside, []
+        chunk_coords, local = np.divmod(coords, size)
+        chunk_index = (chunk_coords[:, 0] * n + chunk_coords[:, 1]) * n + chunk_coords[:, 2]
+        flat = (local[:, 0] * size + local[:, 1]) * size + local[:, 2]
+        order = np.argsort(chunk_index, kind='stable')
+        starts = np.flatnonzero(np.diff(chunk_index[order], prepend=-1))
+        return inside, [(tuple(int(c) for c in chunk_coords[rows[0]]), rows, flat[rows])
+                        for rows in np.split(order, starts[1:])]
+
+    def fill_box(self, lo, hi, block_type):
+        """ Rellena la caja global [lo, hi) con un bloque. """
+        block_id = self._block_id(block_type)
+        return self._edit_box(lo, hi, lambda chunk, box, slices: (self._local_index[slices].reshape(-1), block_id))
+
+    def fill_sphere(self, center, radius, block_type):
+        """ Rellena con un bloque los vóxeles (x, y, z) a distancia <= radius de `center`. """
+        block_id = self._block_id(block_type)
+        center = np.asarray(center, dtype=np.float64)
+        lo = np.floor(center - radius).astype(np.int64)
+        hi = np.floor(center + radius).astype(np.int64) + 1
+
+        def select(chunk, box, slices):
+            x, y, z = (np.arange(box[0][a], box[1][a]) - center[a] for a in range(3))
+            inside = x[:, None, None] ** 2 + y[None, :, None] ** 2 + z[None, None, :] ** 2 <= radius * radius
+            return self._local_index[slices][inside], block_id
+        return self._edit_box(lo, hi, select)
+
+    def replace(self, old_type, new_type, lo=None, hi=None):
+        """ Cambia todos los bloques `old_type` por `new_type` (en la caja [lo, hi) o en todo el mundo). """
+        old_id, new_id = self._block_id(old_type), self._block_id(new_type)
+        if old_id == new_id:
+            return None
+
+        def select(chunk, box, slices):
+            if chunk is None:
+                if old_id != 0:
+                    return None, None  # unallocated chunks are all air
+                voxels = np.zeros(self._local_index[slices].shape, dtype=np.uint32)
+            else:
+                uniform = chunk.storage.uniform_value()
+                if uniform is not None and uniform != old_id:
+                    return None, None  # nothing to replace, and no need to unpack it
+                voxels = chunk.voxels[slices]
+            return self._local_index[slices][voxels == old_id], new_id
+        return self._edit_box((0, 0, 0) if lo is None else lo,
+                              (self.total_size,) * 3 if hi is None else hi, select)
+
+    def apply_changes(self, changes, undo=False):
+        """ Reaplica (o deshace, con undo=True) los cambios de una acción 'bulk'. """
+        for chunk_pos, flat, prev, new in changes:
+            self._write_chunk(chunk_pos, flat.astype(np.intp), prev if undo else new)
+
+    def _edit_box(self, lo, hi, select):
+        """
+        Call `select(chunk_or_None, (box_lo, box_hi), local_slices)` for every
+        chunk overlapping the global box [lo, hi) (clipped to the world); it
+        returns (flat_local_indices, block_ids) to write into that chunk.
+        """
+        lo = [max(int(c), 0) for c in lo]
+        hi = [min(int(c), self.total_size) for c in hi]
+        if any(l >= h for l, h in zip(lo, hi)):
+            return None
+        size = self.base_chunk_size
+        changes = []
+        for cx in range(lo[0] // size, (hi[0] - 1) // size + 1):
+            for cy in range(lo[1] // size, (hi[1] - 1) // size + 1):
+                for cz in range(lo[2] // size, (hi[2] - 1) // size + 1):
+                    origin = (cx * size, cy * size, cz * size)
+                    box_lo = tuple(max(lo[a], origin[a]) for a in range(3))
+                    box_hi = tuple(min(hi[a], origin[a] + size) for a in range(3))
+                    slices = tuple(slice(box_lo[a] - origin[a], box_hi[a] - origin[a]) for a in range(3))
+                    flat, ids = select(self.chunks.get((cx, cy, cz)), (box_lo, box_hi), slices)
+                    if flat is None or not len(flat):
+                        continue
+                    change = self._write_chunk((cx, cy, cz), flat, ids)
+                    if change is not None:
+                        changes.append(change)
+        return self._bulk_action(changes)
+
+    @staticmethod
+    def _bulk_action(changes):
+        return {'type': 'bulk', 'changes': changes} if changes else None
 
-        # Mark the full chunk dirty (we only have one)
+    def _write_chunk(self, chunk_pos, flat, ids):
+        """
+        Write `ids` (scalar or per index) at the flat local indices `flat` of
+        one chunk and mark what needs remeshing. Returns the compact change
+        record (chunk_pos, flat, prev, new) of the voxels that changed, or None.
+        """
+        if not all(0 <= c < self.world_size_in_chunks for c in chunk_pos):
+            return None  # e.g. undo/redo of an edit made before the world shrank
+        chunk = self.chunks.get(chunk_pos)
+        if chunk is None:
+            if not np.any(ids):
+                return None  # air over an unallocated (all-air) chunk
+            chunk = self.get_or_create_chunk(chunk_pos)
+        prev = chunk.voxels.reshape(-1)[flat]
+        changed = prev != ids
+        if not changed.any():
+            return None
+        flat, prev = flat[changed], prev[changed]
+        if np.ndim(ids):
+            ids = ids[changed]
+        voxels = chunk.writable_voxels().reshape(-1)
+        voxels[flat] = ids
+        size = self.base_chunk_size
+        local = np.stack(np.unravel_index(flat, (size, size, size)), axis=1)
+        chunk.note_changes(local, prev, ids)
+        self._mark_bulk_edited(chunk, local, (prev > 0) != (np.asarray(ids) > 0))
+        return (chunk_pos, flat.astype(np.min_scalar_type(voxels.size - 1)),
+                prev.astype(np.min_scalar_type(int(prev.max()))),
+                ids.astype(np.min_scalar_type(int(ids.max()))) if np.ndim(ids) else int(ids))
+
+    def _mark_bulk_edited(self, chunk, local, occupancy_changed):
+        size = self.base_chunk_size
+        if len(local) <= PATCH_EDIT_LIMIT:
+            # Few cells: same bookkeeping as set_voxel, so the mesh is patched in place
+            for local_pos, occupancy in zip(local.tolist(), occupancy_changed.tolist()):
+                self._mark_voxel_edited(chunk, tuple(local_pos), occupancy)
+            return
+
+        self._mark_region(chunk, local.min(axis=0), local.max(axis=0) + 1)
+        # Neighbours whose halo holds a cell that changed occupancy: one step
+        # per axis where the cell lies on that face of the chunk
+        border = local[occupancy_changed]
+        border = border[((border == 0) | (border == size - 1)).any(axis=1)]
+        sides = (border == size - 1).astype(np.int64) - (border == 0)
+        codes = np.flatnonzero(np.bincount((sides + 1) @ np.array([9, 3, 1]), minlength=27))
+        offsets = set()
+        for side in np.stack(np.unravel_index(codes, (3, 3, 3)), axis=1) - 1:
+            offsets.update((dx, dy, dz) for dx in {0, int(side[0])} for dy in {0, int(side[1])}
+                           for dz in {0, int(side[2])})
+        offsets.discard((0, 0, 0))
+        for dx, dy, dz in offsets:
+            neighbour = self.chunks.get((chunk.position[0] + dx, chunk.position[1] + dy, chunk.position[2] + dz))
+            if neighbour is None:
+                continue
+            # The cells it sees, in its own frame (one step outside it)
+            offset = np.array((dx, dy, dz))
+            cells = border[((offset == 0) | (sides == offset)).all(axis=1)] - offset * size
+            self._mark_region(neighbour, cells.min(axis=0), cells.max(axis=0) + 1)
+
+    def mark_dirty(self, chunk):
+        """ Marca un chunk para reconstruir su malla completa. """
+        self.pending_edits.pop(chunk, None)
+        self.dirty_regions.pop(chunk, None)
         self.dirty_chunks.add(chunk)
-        
+        chunk.version += 1
+        self.version += 1
+
+    def _mark_voxel_edited(self, chunk, local_pos, occupancy_changed):
+        """
+        Record a single-voxel edit. Faces and AO of neighbouring chunks only
+        depend on occupancy, so a repaint never reaches them; otherwise a voxel
+        on the chunk border is part of the one-voxel halo of every chunk it
+        touches (diagonals included).
+        """
+        self._mark_edited(chunk, local_pos)
+        if not occupancy_changed:
+            return
+        size = self.base_chunk_size
+        (px, py, pz), (lx, ly, lz) = chunk.position, local_pos
+        for cx, cy, cz in self._border_neighbours(chunk.position, local_pos):
+            neighbour = self.chunks.get((cx, cy, cz))
+            if neighbour is not None:
+                # Same voxel in the neighbour's local frame (one step outside it)
+                self._mark_edited(neighbour, (lx + (px - cx) * size, ly + (py - cy) * size, lz + (pz - cz) * size))
+
+    def _mark_edited(self, chunk, local_pos):
+        self._mark_region(chunk, local_pos, tuple(c + 1 for c in local_pos), [local_pos])
+
+    def _mark_region(self, chunk, lo, hi, cells=None):
+        """
+        Record an edit of the local box [lo, hi) of `chunk`. `cells` lists the
+        edited cells when there are only a few of them (set_voxel); without
+        it only the box is known and the chunk is patched region-wise.
+        """
+        # A chunk already waiting for a full rebuild stays that way
+        fresh = chunk not in self.dirty_chunks
+        if fresh or chunk in self.dirty_regions:
+            region = self.dirty_regions.get(chunk)
+            if region is not None:
+                lo = tuple(min(int(a), b) for a, b in zip(lo, region[0]))
+                hi = tuple(max(int(a), b) for a, b in zip(hi, region[1]))
+            self.dirty_regions[chunk] = (tuple(int(c) for c in lo), tuple(int(c) for c in hi))
+            if cells is not None and (fresh or chunk in self.pending_edits):
+                self.pending_edits.setdefault(chunk, []).extend(cells)
+            else:
+                self.pending_edits.pop(chunk, None)
+        self.dirty_chunks.add(chunk)
+        chunk.version += 1
+        self.version += 1
+
+    def _border_neighbours(self, chunk_pos, local_pos):
+        """Yield the positions of the other chunks whose halo contains this voxel."""
+        last = self.base_chunk_size - 1
+        steps = [[0] + ([-1] if l == 0 else []) + ([1] if l == last else []) for l in local_pos]
+        for dx in steps[0]:
+            for dy in steps[1]:
+                for dz in steps[2]:
+                    if dx or dy or dz:
+                        yield (chunk_pos[0] + dx, chunk_pos[1] + dy, chunk_pos[2] + dz)
+
     def update_dirty_chunks(self):
-        """ Reconstruye la malla de todos los chunks marcados como 'sucios'. """
+        """
+        Sube las mallas terminadas en segundo plano y procesa los chunks sucios:
+        las ediciones pequeñas se parchean en sitio (vóxel a vóxel, o la región
+        editada entera si es pequeña), el resto se reconstruye en el pool de
+        workers (o aquí mismo si está desactivado o se usa 'legacy').
+        """
+        if self.pending_install is not None:
+            self._advance_install(INSTALL_UPLOAD_BYTES)
+
+        touched = set(self.dirty_chunks)
+        for chunk, version, result in chain(self.mesh_workers.poll(), self.process_mesher.poll()):
+            touched.add(chunk)
+            chunk.mesh_job = None
+            # Keyed by the snapshot it was built from, so even a stale result is worth caching
+            self.mesh_cache.put(chunk.mesh_job_key, result)
+            # Results built before a later edit are stale; the chunk is still dirty
+            if version == chunk.version:
+                chunk.apply_mesh_result(result)
+
+        waiting = set()
         # Convertimos a lista para evitar problemas si el set se modifica durante la iteración
         for chunk in list(self.dirty_chunks):
-            chunk.build_mesh()
+            edits = self.pending_edits.pop(chunk, None)
+            region = self.dirty_regions.pop(chunk, None)
+            if chunk.mesh_job is not None:
+                # A rebuild of older data is in flight; rebuild again once it lands
+                waiting.add(chunk)
+            elif chunk.has_no_faces():
+                chunk.build_mesh()
+            elif edits and len(edits) <= PATCH_EDIT_LIMIT and chunk.can_patch():
+                chunk.patch_mesh(edits)
+            elif region and chunk.can_patch() and chunk.region_volume(*region) <= PATCH_REGION_LIMIT * chunk.size ** 3:
+                chunk.patch_region(*region)
+            elif self.mesh_workers.enabled and self.mesher != 'legacy':
+                chunk.submit_mesh_job(self.mesh_workers)
+            else:
+                chunk.build_mesh()
         self.dirty_chunks.clear()
+        self.dirty_chunks.update(waiting)
+        self.pending_edits.clear()
+        self.dirty_regions.clear()
+
+        # Chunks left without any voxel are freed again
+        for chunk in touched:
+            if (chunk.mesh is None and chunk.mesh_job is None and chunk not in self.dirty_chunks
+                    and chunk.is_empty()):
+                self._release_chunk(chunk)
+        self.compact_chunks()
+
+    def prepare_chunks(self, coords, block_ids, world_size_in_chunks=None, progress=None):
+        """
+        Build the contents of the chunks holding `block_ids` at the (N, 3)
+        global coordinates `coords`, for `install_chunks`. Returns
+        {chunk_pos: (PaletteStorage, solid_count)}, packed and without the
+        all-air chunks. Only reads the chunk size, so it can run on another
+        thread (background loads); `progress(fraction)` after each chunk.
+        """
+        ids = np.asarray(block_ids, dtype=np.uint32)
+        inside, groups = self._group_by_chunk(coords, world_size_in_chunks)
+        ids = ids[inside]
+        size = self.base_chunk_size
+        storages = {}
+        for i, (chunk_pos, rows, flat) in enumerate(groups):
+            block = np.zeros(size ** 3, dtype=np.uint32)
+            block[flat] = ids[rows]
+            solid = int(np.count_nonzero(block))
+            if solid:
+                storage = PaletteStorage(size)
+                storage.dense = block.reshape(size, size, size)
+                storage.pack()
+                storages[chunk_pos] = (storage, solid)
+            if progress is not None:
+                progress((i + 1) / len(groups))
+        return storages
+
+    def mesh_prepared_chunks(self, storages, world_size_in_chunks=None, progress=None):
+        """
+        Mesh chunks from `prepare_chunks` as they will sit in a world of
+        `world_size_in_chunks` chunks per axis, without touching the world
+        (background loads). Padded blocks are read straight from the packed
+        storages and meshed in the process pool, or on this thread when it is
+        disabled. Returns ({chunk_pos: build_chunk_mesh result}, greedy flag
+        used); with the 'legacy' mesher nothing is meshed here.
+        `progress(fraction)` after each batch.
+        """
+        greedy = self.greedy_meshing
+        if self.mesher == 'legacy' or not storages:
+            return {}, greedy
+        size = self.base_chunk_size
+        total_size = size * (self.world_size_in_chunks if world_size_in_chunks is None else world_size_in_chunks)
+        full = size ** 3
+        cache = self.mesh_cache
+
+        def storage_at(chunk_pos):
+            entry = storages.get(chunk_pos)
+            return entry[0] if entry is not None else None
+
+        def is_full(chunk_pos):
+            entry = storages.get(chunk_pos)
+            return entry is not None and entry[1] == full
+
+        meshes = {}
+        positions = list(storages)
+        batch_size = max(1, LOAD_MESH_BATCH_BYTES // ((size + 2) ** 3 * 4))
+        for start in range(0, len(positions), batch_size):
+            jobs = []
+            for chunk_pos in positions[start:start + batch_size]:
+                cx, cy, cz = chunk_pos
+                # Same test as Chunk.is_buried, on the chunks about to be installed
+                if is_full(chunk_pos) and all(is_full(n) for n in (
+                        (cx - 1, cy, cz), (cx + 1, cy, cz), (cx, cy - 1, cz),
+                        (cx, cy + 1, cz), (cx, cy, cz - 1), (cx, cy, cz + 1))):
+                    meshes[chunk_pos] = empty_mesh_result()
+                    continue
+                origin = (cx * size, cy * size, cz * size)
+                padded = self._read_region(storage_at, total_size, origin[0] - 1, origin[1] - 1, origin[2] - 1,
+                                           origin[0] + size + 1, origin[1] + size + 1, origin[2] + size + 1)
+                key = cache.key(padded, origin, greedy) if cache.enabled else None
+                result = cache.get(key) if key is not None else None
+                if result is not None:
+                    meshes[chunk_pos] = result
+                else:
+                    jobs.append((chunk_pos, key, padded, origin))
+
+            if self.process_mesher.enabled:
+                results = self.process_mesher.mesh_batch(size, [(padded, origin, greedy)
+                                                                for _, _, padded, origin in jobs])
+            else:
+                results = [build_chunk_mesh(padded, origin, size, greedy) for _, _, padded, origin in jobs]
+            for (chunk_pos, key, _, _), result in zip(jobs, results):
+                cache.put(key, result)
+                meshes[chunk_pos] = result
+            if progress is not None:
+                progress(min(start + batch_size, len(positions)) / len(positions))
+        return meshes, greedy
+
+    def install_chunks(self, storages, world_size_in_chunks=None, pivot=None, meshes=None, greedy=None):
+        """
+        Replace the whole content of the world at once by chunks built with
+        `prepare_chunks` (resizing it first if asked). Same as `begin_install`,
+        but every mesh is uploaded right away (scripts, synchronous loads).
+        """
+        self.begin_install(storages, world_size_in_chunks, pivot, meshes, greedy)
+        self._advance_install(None)
+
+    def begin_install(self, storages, world_size_in_chunks=None, pivot=None, meshes=None, greedy=None):
+        """
+        Start replacing the whole content of the world by chunks built with
+        `prepare_chunks` and their meshes from `mesh_prepared_chunks` (built
+        with greedy meshing `greedy`). The new chunks are set up aside and
+        `update_dirty_chunks` uploads their meshes a few per frame
+        (INSTALL_UPLOAD_BYTES) while the current world keeps drawing; once all
+        are on the GPU both are swapped in one step. Without `meshes` every
+        chunk is remeshed after the swap (rebuild_all). Replaces an install
+        still in progress.
+        """
+        from src.core.Chunk import Chunk
+        self.cancel_install()
+        chunks = {}
+        for chunk_pos, (storage, solid) in storages.items():
+            chunk = Chunk(self, chunk_pos, self.base_chunk_size)
+            chunk.adopt_storage(storage, solid)
+            chunks[chunk_pos] = chunk
+        self.pending_install = {
+            'chunks': chunks, 'size': world_size_in_chunks, 'pivot': pivot, 'greedy': greedy,
+            'meshed': None if meshes is None else set(meshes),
+            'uploads': [] if meshes is None else [(chunks[pos], result) for pos, result in meshes.items()
+                                                  if pos in chunks],
+        }
+
+    def cancel_install(self):
+        """ Descarta la instalación pendiente (y las mallas que ya había subido). """
+        install, self.pending_install = self.pending_install, None
+        if install is None:
+            return
+        for chunk in install['chunks'].values():
+            if chunk.mesh:
+                chunk.mesh.destroy()
+                chunk.mesh = None
+
+    def _advance_install(self, budget_bytes):
+        """ Sube mallas de la instalación pendiente (al menos una; todas sin presupuesto) y la activa al terminar. """
+        uploads = self.pending_install['uploads']
+        spent = 0
+        while uploads and (budget_bytes is None or spent < budget_bytes):
+            chunk, result = uploads.pop()
+            chunk.apply_mesh_result(result)
+            spent += sum(result[name].nbytes for name in ('vertices', 'indices') if result[name] is not None)
+        if not uploads:
+            self._swap_install()
+
+    def _swap_install(self):
+        install, self.pending_install = self.pending_install, None
+        self.clear()
+        size = install['size']
+        if size is not None and size != self.world_size_in_chunks:
+            self.resize(size)
+        self.chunks.update(install['chunks'])
+        if install['pivot'] is not None:
+            self.pivot = tuple(min(max(int(c), 0), self.total_size - 1) for c in install['pivot'])
+        self.version += 1
+        if install['meshed'] is None:
+            self.rebuild_all()
+            return
+        for chunk_pos, chunk in self.chunks.items():
+            # Not meshed in the background ('legacy'), or greedy meshing was toggled meanwhile
+            if chunk_pos not in install['meshed'] or install['greedy'] != self.greedy_meshing:
+                self.mark_dirty(chunk)
+
+    def snapshot(self):
+        """
+        Instantánea copy-on-write del mundo para trabajos largos en segundo plano
+        (guardar, exportar): comparte los arrays de los chunks hasta su próxima
+        escritura, así que tomarla no copia vóxeles ni bloquea la edición.
+        """
+        from src.core.WorldSnapshot import WorldSnapshot
+        return WorldSnapshot(self)
+
+    def touch_unpacked(self, chunk):
+        """ Llamado por Chunk.voxels: el chunk pasa al final del LRU de chunks descomprimidos. """
+        self.unpacked_chunks[chunk] = None
+        self.unpacked_chunks.move_to_end(chunk)
+
+    def compact_chunks(self):
+        """
+        Comprime (paleta) los chunks descomprimidos menos usados recientemente
+        hasta quedar en `unpacked_limit`. Se llama entre frames, cuando nadie
+        guarda referencias a `chunk.voxels`.
+        """
+        while len(self.unpacked_chunks) > self.unpacked_limit:
+            chunk, _ = self.unpacked_chunks.popitem(last=False)
+            chunk.storage.pack()
+
+    def get_voxel_memory(self):
+        """Bytes used by voxel storage over all chunks."""
+        return sum(chunk.storage.nbytes for chunk in self.chunks.values())
+
+    def rebuild_all(self):
+        """
+        Reconstrucción masiva tras cargar o limpiar el mundo: todos los chunks
+        se mallan en paralelo en el pool de procesos. Los chunks vacíos o
+        enterrados se resuelven aquí mismo sin enviarlos a ningún proceso.
+        """
+        for chunk in self.chunks.values():
+            self.mark_dirty(chunk)
+        if not self.process_mesher.enabled or self.mesher == 'legacy':
+            return
+
+        jobs = []
+        for chunk in self.chunks.values():
+            if chunk.mesh_job is not None:
+                continue  # stays dirty and is rebuilt once the job in flight lands
+            self.dirty_chunks.discard(chunk)
+            if chunk.has_no_faces():
+                chunk.apply_mesh_result(empty_mesh_result())
+                continue
+            padded = chunk.get_padded_voxels()
+            origin = chunk.get_global_pos(0, 0, 0)
+            if chunk.try_cached_mesh(padded):
+                continue
+            jobs.append((chunk, chunk.version, padded, origin, self.greedy_meshing))
+
+        futures = self.process_mesher.submit_batch(jobs)
+        for (chunk, *_), future in zip(jobs, futures):
+            chunk.mesh_job = future
+
+    def shutdown(self):
+        """ Detiene los pools de mallas en segundo plano. """
+        self.cancel_install()
+        self.mesh_workers.shutdown()
+        self.process_mesher.shutdown()
+
+    def set_greedy_meshing(self, enabled):
+        """ Activa/desactiva el greedy meshing y reconstruye todos los chunks. """
+        self.greedy_meshing = bool(enabled)
+        for chunk in self.chunks.values():
+            self.mark_dirty(chunk)
+
+    def get_mesh_stats(self):
+        """Return (visible_faces, emitted_quads) summed over all chunks."""
+        faces = sum(chunk.face_count for chunk in self.chunks.values())
+        quads = sum(chunk.quad_count for chunk in self.chunks.values())
+        return faces, quads
+
+    def get_voxels(self, coords):
+        """
+        Block ids at the (N, 3) integer global coordinates `coords`, as a
+        uint32 array of length N. Cells outside the world or in unallocated
+        chunks are air (0).
+        """
+        inside, groups = self._group_by_chunk(coords)
+        found = np.zeros(int(inside.sum()), dtype=np.uint32)
+        for chunk_pos, rows, flat in groups:
+            chunk = self.chunks.get(chunk_pos)
+            if chunk is None:
+                continue
+            uniform = chunk.storage.uniform_value()
+            if uniform is not None:
+                found[rows] = uniform  # single block type: no need to unpack it
+            else:
+                found[rows] = chunk.voxels.reshape(-1)[flat]
+        result = np.zeros(len(inside), dtype=np.uint32)
+        result[inside] = found
+        return result
+
+    def is_solid_many(self, coords):
+        """ Versión vectorizada de is_solid: array booleano para (N, 3) coordenadas globales. """
+        return self.get_voxels(coords) > 0
 
     def get_voxel(self, x, y, z):
         """Return voxel id at global coordinates (x,y,z). Returns 0 for out-of-bounds or air."""
@@ -87,6 +754,6 @@ class World:
             if not chunk:
                 return 0
             lx, ly, lz = local_pos
-            return int(chunk.voxels[lx, ly, lz])
+            return chunk.get_voxel(lx, ly, lz)
         except Exception:
             return 0
\ No newline at end of file
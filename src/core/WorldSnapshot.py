@@ -0,0 +1,76 @@
+# src/core/WorldSnapshot.py
+"""
+Read-only, copy-on-write snapshot of a World (see `World.snapshot`).
+
+Taking a snapshot copies no voxel data: every chunk's PaletteStorage is
+shared (`PaletteStorage.share`) and the live chunk copies its arrays on its
+next in-place write, so only the chunks edited while a job runs are ever
+duplicated. Saving, exporting or any other long-running reader can then
+walk the snapshot on a background thread while the user keeps editing.
+
+The snapshot mirrors the read side of World (`chunks`, `get_voxel`,
+`get_voxels`, `get_region`, `pivot`, sizes), and its chunks the read side
+of Chunk, so code written against a World can read a snapshot instead.
+"""
+import numpy as np
+
+from src.core.World import World
+
+
+class SnapshotChunk:
+    def __init__(self, chunk):
+        self.position = chunk.position
+        self.size = chunk.size
+        self.storage = chunk.storage.share()
+        self.solid_count = chunk.solid_count
+        # The live chunk's box, unless it is waiting to be recomputed
+        self._bounds = chunk._bounds
+        self._bounds_stale = chunk._bounds_stale
+
+    @property
+    def voxels(self):
+        """(size, size, size) uint32 block ids. Read only: the array may be shared with the live chunk."""
+        return self.storage.unpacked()
+
+    def is_empty(self):
+        return self.solid_count == 0
+
+    @property
+    def bounds(self):
+        """Local AABB (lo, hi) of the non-air voxels, or None if the chunk is empty."""
+        if self._bounds_stale:
+            self._bounds_stale = False
+            self._bounds = None
+            if self.solid_count:
+                occupied = np.argwhere(self.voxels != 0)
+                self._bounds = (tuple(int(c) for c in occupied.min(axis=0)),
+                                tuple(int(c) for c in occupied.max(axis=0) + 1))
+        return self._bounds
+
+    def get_voxel(self, x, y, z):
+        return self.storage.get(x, y, z)
+
+    def get_global_pos(self, x, y, z):
+        return (self.position[0] * self.size + x,
+                self.position[1] * self.size + y,
+                self.position[2] * self.size + z)
+
+
+class WorldSnapshot:
+    def __init__(self, world):
+        self.version = world.version
+        self.base_chunk_size = world.base_chunk_size
+        self.world_size_in_chunks = world.world_size_in_chunks
+        self.total_size = world.total_size
+        self.pivot = world.pivot
+        self.chunks = {position: SnapshotChunk(chunk) for position, chunk in world.chunks.items()}
+
+    # Same read-only queries as World; they only use the attributes above
+    get_local_pos = World.get_local_pos
+    in_bounds = World.in_bounds
+    get_voxel = World.get_voxel
+    get_region = World.get_region
+    _chunk_storage = World._chunk_storage
+    _read_region = World._read_region
+    _group_by_chunk = World._group_by_chunk
+    get_voxels = World.get_voxels
@@ -24,11 +24,14 @@ class ActionHistory:
         if not self.can_undo():
             return False
         action = self.undo_stack.pop()
-        # action types: 'set' where action contains pos, prev, new
+        # action types: 'set' where action contains pos, prev, new;
+        # 'bulk' as returned by the World bulk edits (set_voxels, fill_box, ...)
         if action.get('type') == 'set':
             x, y, z = action['pos']
             prev = action['prev']
             world.set_voxel(x, y, z, prev)
+        elif action.get('type') == 'bulk':
+            world.apply_changes(action['changes'], undo=True)
         self.redo_stack.append(action)
         return True
 
@@ -40,5 +43,7 @@ class ActionHistory:
             x, y, z = action['pos']
             new = action['new']
             world.set_voxel(x, y, z, new)
+        elif action.get('type') == 'bulk':
+            world.apply_changes(action['changes'])
         self.undo_stack.append(action)
         return True
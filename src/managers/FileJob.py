@@ -0,0 +1,58 @@
+# src/managers/FileJob.py
+"""
+Carga o guardado de un modelo en un hilo en segundo plano.
+
+A job never touches the live World. A load only reads the file and prepares
+the new chunk contents and meshes (see `FileManager.prepare_load`); a save serializes a
+copy-on-write snapshot taken when it started (see `FileManager.start_save`).
+The main loop polls `done` once per frame and then hands the job back to
+FileManager (`finish_load` / `finish_save`), which applies the result between
+two frames, so the editor keeps rendering and editing meanwhile.
+"""
+import threading
+
+
+class JobCancelled(Exception):
+    """ Lanzada dentro del hilo del trabajo cuando se pide cancelar. """
+
+
+class FileJob:
+    def __init__(self, filepath, work, stage):
+        self.filepath = filepath
+        # Read by the UI every frame; written only by the job's thread
+        self.stage = stage
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(work,), name='file-job', daemon=True)
+        self.thread.start()
+
+    def report(self, stage, fraction):
+        """ Llamado por el hilo del trabajo; es también donde se atiende la cancelación. """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.stage, self.progress = stage, min(max(float(fraction), 0.0), 1.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        self.thread.join(timeout)
+        return self.done
+
+    def _run(self, work):
+        try:
+            self.result = work(self)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.error = e
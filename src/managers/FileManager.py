@@ -2,6 +2,11 @@
 import os
 import numpy as np
 from tkinter import Tk, filedialog
+from src.utils.VlxFormat import read_model, write_model
+from src.managers.FileJob import FileJob
+
+# .vlx (texto) y .vlxb (binario, ver src/utils/VlxFormat.py); el formato sale de la extensión
+MODEL_FILETYPES = [("Voxeland Model", "*.vlx"), ("Voxeland Binary Model", "*.vlxb")]
 
 class FileManager:
     def __init__(self, world, block_type_enum, history_manager):
@@ -10,191 +15,249 @@ class FileManager:
         self.history_manager = history_manager
 
     def clear_world(self):
-        for chunk in self.world.chunks.values():
-            chunk.voxels.fill(self.BlockType.Air.value)
-            self.world.dirty_chunks.add(chunk)
+        # Chunks are allocated on demand, so an empty world simply has none
+        self.world.cancel_install()
+        self.world.clear()
         print("World cleared.")
 
-    def save_world(self):
+    def ask_save_path(self):
         root = Tk(); root.withdraw()
-        filepath = filedialog.asksaveasfilename(defaultextension=".vlx", filetypes=[("Voxeland Model", "*.vlx")], title="Save Voxeland Model")
+        filepath = filedialog.asksaveasfilename(defaultextension=".vlx", filetypes=MODEL_FILETYPES, title="Save Voxeland Model")
         root.destroy()
+        return filepath or None
+
+    def save_world(self):
+        filepath = self.ask_save_path()
         if not filepath: return None
+        return self.save_world_to_path(filepath)
 
-        min_coords, max_coords, voxel_data, has_voxels = np.array([np.inf]*3), np.array([-np.inf]*3), [], False
-        for chunk in self.world.chunks.values():
-            non_air = np.argwhere(chunk.voxels != self.BlockType.Air.value)
-            if non_air.size == 0: continue
-            has_voxels = True
-            for x, y, z in non_air:
-                block_id = chunk.voxels[x, y, z]
-                gx, gy, gz = chunk.get_global_pos(x, y, z)
-                rot_gx, rot_gy, rot_gz = gx, gz, gy
-                min_coords = np.minimum(min_coords, [rot_gx, rot_gy, rot_gz])
-                max_coords = np.maximum(max_coords, [rot_gx, rot_gy, rot_gz])
-                voxel_data.append((rot_gx, rot_gy, rot_gz, int(block_id)))
-        
+    def save_world_to_path(self, filepath, snapshot=None):
+        """ Guardado síncrono (scripts, benchmarks): lo mismo que start_save + finish_save en este hilo. """
         try:
-            # If a pivot exists, include it in the AABB calculation. The file
-            # format swaps Y and Z when writing, so apply the same rotation to
-            # the pivot when comparing with min/max.
-            pivot_included = False
-            try:
-                if hasattr(self.world, 'pivot') and self.world.pivot is not None:
-                    px, py, pz = map(int, self.world.pivot)
-                    rot_pivot = np.array([px, pz, py], dtype=np.float64)
-                    if has_voxels:
-                        min_coords = np.minimum(min_coords, rot_pivot)
-                        max_coords = np.maximum(max_coords, rot_pivot)
-                    else:
-                        # No voxels at all; pivot defines the AABB
-                        min_coords = np.minimum(min_coords, rot_pivot)
-                        max_coords = np.maximum(max_coords, rot_pivot)
-                    pivot_included = True
-            except Exception:
-                pivot_included = False
-
-            with open(filepath, 'w') as f:
-                f.write("# Voxeland Model Format v1.0\n")
-                if has_voxels or pivot_included:
-                    aabb = " ".join(map(str, np.round(np.concatenate((min_coords, max_coords)))))
-                else:
-                    aabb = "0 0 0 0 0 0"
-                f.write(f"AABB {aabb}\n")
-                # Save pivot information (world-space voxel integer coordinates)
-                try:
-                    if hasattr(self.world, 'pivot') and self.world.pivot is not None:
-                        px, py, pz = self.world.pivot
-                        f.write(f"PIVOT {int(px)} {int(py)} {int(pz)}\n")
-                    else:
-                        f.write("PIVOT 0 0 0\n")
-                except Exception:
-                    f.write("PIVOT 0 0 0\n")
-                f.write("# VOXELS: x y z block_type_id\n")
-                for data in voxel_data: f.write(f"VOXEL {data[0]} {data[1]} {data[2]} {data[3]}\n")
-            print(f"World saved to {filepath} with Y-Z axis swapped.")
-            self.history_manager.add_entry(filepath)
-            return filepath
+            self.write_snapshot(filepath, snapshot if snapshot is not None else self.world.snapshot())
         except Exception as e:
             print(f"Error saving file: {e}")
             return None
+        return self._saved(filepath)
 
-    def load_world(self):
+    def start_save(self, filepath):
+        """
+        Save the world to `filepath` on a background thread and return its
+        FileJob. The world is snapshotted here (copy-on-write, no voxel
+        copies), so edits made while the job runs are not part of this save.
+        """
+        snapshot = self.world.snapshot()
+        return FileJob(filepath, lambda job: self.write_snapshot(filepath, snapshot, job), "Saving")
+
+    def finish_save(self, job):
+        """ Main thread, once `job.done`: reports the save and records it in the history. Returns the path or None. """
+        if job.error is not None:
+            print(f"Error saving file: {job.error}")
+            return None
+        return self._saved(job.filepath)
+
+    def _saved(self, filepath):
+        print(f"World saved to {filepath} with Y-Z axis swapped.")
+        self.history_manager.add_entry(filepath)
+        return filepath
+
+    def write_snapshot(self, filepath, world, job=None):
+        """
+        Serialize a WorldSnapshot to `filepath` (safe on a worker thread).
+        write_model replaces the file atomically, so a failed save leaves
+        the previous file intact. Raises on error.
+        """
+        report = job.report if job is not None else (lambda stage, fraction: None)
+        # Gather every non-air voxel as whole arrays: (N, 3) file coordinates
+        # (Y and Z swapped) and (N,) block ids, chunk by chunk in argwhere order
+        coords, ids = [], []
+        chunks = list(world.chunks.values())
+        for i, chunk in enumerate(chunks):
+            report("Collecting", 0.5 * i / len(chunks))
+            if chunk.is_empty(): continue
+            # Only the box holding the chunk's non-air voxels is scanned
+            lo, hi = chunk.bounds
+            box = chunk.voxels[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+            non_air = np.argwhere(box != self.BlockType.Air.value)
+            if non_air.size == 0: continue
+            ids.append(box[tuple(non_air.T)])
+            coords.append((non_air + np.add(chunk.get_global_pos(0, 0, 0), lo))[:, [0, 2, 1]])
+        has_voxels = bool(coords)
+        coords = np.concatenate(coords) if coords else np.zeros((0, 3), dtype=np.int64)
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.uint32)
+        min_coords, max_coords = np.array([np.inf]*3), np.array([-np.inf]*3)
+        if has_voxels:
+            min_coords, max_coords = coords.min(axis=0).astype(np.float64), coords.max(axis=0).astype(np.float64)
+
+        # If a pivot exists, include it in the AABB calculation. The file
+        # format swaps Y and Z when writing, so apply the same rotation to
+        # the pivot when comparing with min/max.
+        pivot_included = False
+        try:
+            if hasattr(world, 'pivot') and world.pivot is not None:
+                px, py, pz = map(int, world.pivot)
+                rot_pivot = np.array([px, pz, py], dtype=np.float64)
+                if has_voxels:
+                    min_coords = np.minimum(min_coords, rot_pivot)
+                    max_coords = np.maximum(max_coords, rot_pivot)
+                else:
+                    # No voxels at all; pivot defines the AABB
+                    min_coords = np.minimum(min_coords, rot_pivot)
+                    max_coords = np.maximum(max_coords, rot_pivot)
+                pivot_included = True
+        except Exception:
+            pivot_included = False
+
+        aabb = None
+        if has_voxels or pivot_included:
+            aabb = np.round(np.concatenate((min_coords, max_coords)))
+        # Save pivot information (world-space voxel integer coordinates)
+        pivot = None
+        try:
+            if hasattr(world, 'pivot') and world.pivot is not None:
+                pivot = tuple(int(c) for c in world.pivot)
+        except Exception:
+            pivot = None
+        report("Writing", 0.5)
+        write_model(filepath, np.column_stack((coords, ids.astype(np.int64))), pivot, aabb)
+
+    def ask_load_path(self):
         root = Tk(); root.withdraw()
-        filepath = filedialog.askopenfilename(filetypes=[("Voxeland Model", "*.vlx")], title="Load Voxeland Model")
+        filepath = filedialog.askopenfilename(filetypes=[("Voxeland Models", "*.vlx *.vlxb")] + MODEL_FILETYPES, title="Load Voxeland Model")
         root.destroy()
+        return filepath or None
+
+    def load_world(self):
+        filepath = self.ask_load_path()
         if not filepath: return None
         return self.load_world_from_path(filepath)
 
     def load_world_from_path(self, filepath):
+        """ Carga síncrona (scripts, benchmarks): lo mismo que start_load + finish_load en este hilo. """
+        if not self._check_exists(filepath): return None
+        try:
+            model = self.prepare_load(filepath)
+        except Exception as e:
+            print(f"Error loading file: {e}")
+            return None
+        return self._install_model(model, at_once=True)
+
+    def start_load(self, filepath):
+        """
+        Start loading `filepath` on a background thread and return its FileJob
+        (None if the file is missing). The world is untouched until the job
+        is passed to finish_load.
+        """
+        if not self._check_exists(filepath): return None
+        return FileJob(filepath, lambda job: self.prepare_load(filepath, job), "Reading")
+
+    def finish_load(self, job):
+        """
+        Main thread, once `job.done`: hands the loaded chunks and their meshes
+        to the world, which swaps them in once uploaded (World.begin_install).
+        Returns the path or None.
+        """
+        if job.cancelled:
+            print(f"Loading {job.filepath} cancelled.")
+            return None
+        if job.error is not None:
+            print(f"Error loading file: {job.error}")
+            return None
+        return self._install_model(job.result)
+
+    def _check_exists(self, filepath):
         if not os.path.exists(filepath):
             print(f"Error: File not found at '{filepath}'. Removing from history.")
             self.history_manager.remove_entry(filepath)
-            return None
-        # Read file first and collect voxel entries so we can compute AABB and
-        # derive a translation that centers the model horizontally and places
-        # its bottom at y=0 (center-bottom of the editor).
-        self.clear_world()
-        try:
-            voxels = []  # list of (x,y,z,block_id) in world/global coords
-            file_pivot = None
-            with open(filepath, 'r') as f:
-                for line in f:
-                    if not line.strip() or line.startswith('#'):
-                        continue
-                    parts = line.split()
-                    if parts[0] == 'VOXEL' and len(parts) == 5:
-                        fx, fy, fz, block_id = map(int, parts[1:])
-                        # The file format swaps Y and Z when writing; apply same
-                        # rotation when reading (file: fx,fy,fz -> world: x=fx, y=fz, z=fy)
-                        ex, ey, ez = fx, fz, fy
-                        voxels.append((ex, ey, ez, int(block_id)))
-                    elif parts[0] == 'PIVOT' and len(parts) == 4:
-                        try:
-                            px, py, pz = map(int, parts[1:])
-                            file_pivot = (px, py, pz)
-                        except Exception:
-                            file_pivot = None
-
-            if not voxels and file_pivot is None:
-                # Nothing to place; still register history and return
-                print(f"World loaded from {filepath} (empty)")
-                self.history_manager.add_entry(filepath)
-                return filepath
-
-            # Compute AABB from collected voxels (and include pivot if present)
-            import numpy as _np
-            coords = _np.array([[v[0], v[1], v[2]] for v in voxels], dtype=_np.int64) if voxels else _np.zeros((0,3), dtype=_np.int64)
-            if file_pivot is not None:
-                # Include pivot in AABB calculation
-                px, py, pz = file_pivot
-                pivot_arr = _np.array([[int(px), int(py), int(pz)]], dtype=_np.int64)
-                coords = _np.vstack([coords, pivot_arr]) if coords.size else pivot_arr
-
-            min_coords = coords.min(axis=0) if coords.size else _np.array([0,0,0], dtype=_np.int64)
-            max_coords = coords.max(axis=0) if coords.size else _np.array([0,0,0], dtype=_np.int64)
-
-            # Determine translation: center model X/Z to world center, place model bottom at y=0
-            world_size = getattr(self.world, 'total_size', None)
-            if world_size is None:
-                world_size = getattr(self.world, 'base_chunk_size', 32) * getattr(self.world, 'world_size_in_chunks', 2)
-
-            # Use integer world center
-            world_center = _np.array([world_size // 2, 0, world_size // 2], dtype=_np.int64)
-
-            model_center_xz = _np.array([(min_coords[0] + max_coords[0]) / 2.0, (min_coords[2] + max_coords[2]) / 2.0])
-            # translation x and z to place model center at world center
-            tx = int(round(world_center[0] - model_center_xz[0]))
-            tz = int(round(world_center[2] - model_center_xz[1]))
-            # translation y to move min_y to 0 (bring bottom to y=0)
-            ty = int(-min_coords[1])
-
-            # Apply tentative translation and ensure the translated AABB fits inside the world
-            translated_min = min_coords + _np.array([tx, ty, tz], dtype=_np.int64)
-            translated_max = max_coords + _np.array([tx, ty, tz], dtype=_np.int64)
-
-            # If out of bounds, shift to fit within [0, world_size-1]
-            adjust = _np.array([0,0,0], dtype=_np.int64)
-            if translated_min[0] < 0:
-                adjust[0] = -translated_min[0]
-            if translated_min[1] < 0:
-                adjust[1] = -translated_min[1]
-            if translated_min[2] < 0:
-                adjust[2] = -translated_min[2]
-            if translated_max[0] >= world_size:
-                adjust[0] = min(adjust[0], world_size - 1 - translated_max[0])
-            if translated_max[1] >= world_size:
-                adjust[1] = min(adjust[1], world_size - 1 - translated_max[1])
-            if translated_max[2] >= world_size:
-                adjust[2] = min(adjust[2], world_size - 1 - translated_max[2])
-
-            tx += int(adjust[0]); ty += int(adjust[1]); tz += int(adjust[2])
-
-            # Place voxels with applied translation
-            for ex, ey, ez, block_id in voxels:
-                nx = int(ex + tx); ny = int(ey + ty); nz = int(ez + tz)
-                # Bounds check to be defensive
-                if not (0 <= nx < world_size and 0 <= ny < world_size and 0 <= nz < world_size):
-                    # Skip voxels that still fall outside the world after adjustment
-                    continue
-                try:
-                    self.world.set_voxel(nx, ny, nz, self.BlockType(block_id))
-                except ValueError:
-                    print(f"Warning: Unknown block ID '{block_id}'. Skipping.")
-
-            # Translate and set pivot if present
-            if file_pivot is not None:
-                px, py, pz = file_pivot
-                new_px = int(px + tx); new_py = int(py + ty); new_pz = int(pz + tz)
-                # Clamp pivot inside world
-                new_px = max(0, min(world_size - 1, new_px))
-                new_py = max(0, min(world_size - 1, new_py))
-                new_pz = max(0, min(world_size - 1, new_pz))
-                self.world.pivot = (new_px, new_py, new_pz)
-
-            print(f"World loaded from {filepath}")
+            return False
+        return True
+
+    def prepare_load(self, filepath, job=None):
+        """
+        Read `filepath` and build the new chunk contents and their meshes
+        without touching the world (safe on the loader thread). Reports
+        progress to `job` and stops there with JobCancelled if it was cancelled.
+        """
+        report = job.report if job is not None else (lambda stage, fraction: None)
+        model = {'path': filepath, 'storages': {}, 'size_in_chunks': None, 'pivot': None,
+                 'meshes': None, 'greedy': None}
+        voxels, file_pivot, _ = read_model(filepath, lambda fraction: report("Reading", 0.4 * fraction))
+        # The file format swaps Y and Z when writing; apply same
+        # rotation when reading (file: fx,fy,fz -> world: x=fx, y=fz, z=fy)
+        voxels = voxels[:, [0, 2, 1, 3]]
+
+        if not len(voxels) and file_pivot is None:
+            return model  # nothing to place
+
+        # Derive a translation that centers the model horizontally and places
+        # its bottom at y=0 (center-bottom of the editor). Compute AABB from
+        # the voxels (and include pivot if present)
+        coords = voxels[:, :3]
+        if file_pivot is not None:
+            pivot_arr = np.array([[int(c) for c in file_pivot]], dtype=np.int64)
+            coords = np.vstack([coords, pivot_arr]) if coords.size else pivot_arr
+        min_coords, max_coords = coords.min(axis=0), coords.max(axis=0)
+
+        # Grow the world (whole chunks per axis) when the model does not fit in it
+        chunk_size = self.world.base_chunk_size
+        size_in_chunks = self.world.world_size_in_chunks
+        extent = int((max_coords - min_coords).max()) + 1
+        if extent > chunk_size * size_in_chunks:
+            size_in_chunks = -(-extent // chunk_size)
+        world_size = chunk_size * size_in_chunks
+        model['size_in_chunks'] = size_in_chunks
+
+        # Determine translation: center model X/Z to world center, place model bottom at y=0
+        world_center = np.array([world_size // 2, 0, world_size // 2], dtype=np.int64)
+        model_center_xz = np.array([(min_coords[0] + max_coords[0]) / 2.0, (min_coords[2] + max_coords[2]) / 2.0])
+        translation = np.array([int(round(world_center[0] - model_center_xz[0])), int(-min_coords[1]),
+                                int(round(world_center[2] - model_center_xz[1]))], dtype=np.int64)
+
+        # If the translated AABB is out of bounds, shift it to fit within [0, world_size-1]
+        translated_min, translated_max = min_coords + translation, max_coords + translation
+        adjust = np.maximum(-translated_min, 0)
+        over = translated_max >= world_size
+        adjust[over] = np.minimum(adjust[over], world_size - 1 - translated_max[over])
+        translation += adjust
+
+        if len(voxels):
+            ids = voxels[:, 3]
+            # Block ids are validated against the enum once, through a lookup table
+            valid_ids = [int(b.value) for b in self.BlockType]
+            lookup = np.zeros(max(valid_ids) + 1, dtype=bool)
+            lookup[valid_ids] = True
+            known = (ids >= 0) & (ids < len(lookup))
+            known[known] = lookup[ids[known]]
+            for block_id in np.unique(ids[~known]):
+                print(f"Warning: Unknown block ID '{block_id}'. Skipping.")
+            # Voxels that still fall outside the world after adjustment are skipped
+            model['storages'] = self.world.prepare_chunks(
+                voxels[known, :3] + translation, ids[known], size_in_chunks,
+                lambda fraction: report("Placing", 0.4 + 0.2 * fraction))
+            model['meshes'], model['greedy'] = self.world.mesh_prepared_chunks(
+                model['storages'], size_in_chunks, lambda fraction: report("Meshing", 0.6 + 0.4 * fraction))
+
+        if file_pivot is not None:
+            model['pivot'] = tuple(int(c) for c in np.asarray(file_pivot, dtype=np.int64) + translation)
+        return model
+
+    def _install_model(self, model, at_once=False):
+        """ Swap a model from prepare_load into the world (main thread); see World.begin_install. """
+        filepath = model['path']
+        if not model['storages'] and model['pivot'] is None:
+            # Nothing to place; still register history and return
+            self.clear_world()
+            print(f"World loaded from {filepath} (empty)")
             self.history_manager.add_entry(filepath)
             return filepath
-        except Exception as e:
-            print(f"Error loading file: {e}")
-            return None
\ No newline at end of file
+        resized = model['size_in_chunks'] != self.world.world_size_in_chunks
+        # Every chunk is replaced at once, between two frames; the current world keeps
+        # drawing until the meshes built on the loader thread are uploaded
+        install = self.world.install_chunks if at_once else self.world.begin_install
+        install(model['storages'], model['size_in_chunks'], model['pivot'], model['meshes'], model['greedy'])
+        if resized:
+            size = self.world.base_chunk_size * model['size_in_chunks']
+            print(f"World resized to {size}^3 to fit the model.")
+        print(f"World loaded from {filepath}")
+        self.history_manager.add_entry(filepath)
+        return filepath
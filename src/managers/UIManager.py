@@ -5,6 +5,8 @@ import os
 import time
 import imgui
 import glfw
+from src.utils.Config import VERTEX_DTYPE, SHARED_QUAD_INDICES, MAX_WORLD_SIZE_IN_CHUNKS
+from src.core.BufferPool import buffer_pool
 
 class UIManager:
     def __init__(self, window, app):
@@ -188,9 +190,45 @@ class UIManager:
         imgui.separator()
         if imgui.button("Clear"):
             self.app.app_clear_world()
+        imgui.separator()
+        self.draw_world_size()
+        imgui.separator()
+        self.draw_mesher_stats()
         imgui.end_child()
         imgui.end()
 
+    def draw_world_size(self):
+        world = self.app.scene.world
+        if getattr(self, 'world_size_edit', None) is None:
+            self.world_size_edit = world.world_size_in_chunks
+        imgui.text(f"World: {world.total_size}^3 voxels, {len(world.chunks)} chunks allocated")
+        imgui.push_item_width(100)
+        _, value = imgui.input_int("Chunks per axis", self.world_size_edit)
+        imgui.pop_item_width()
+        self.world_size_edit = max(1, min(MAX_WORLD_SIZE_IN_CHUNKS, value))
+        imgui.same_line()
+        if imgui.button("Resize") and self.world_size_edit != world.world_size_in_chunks:
+            world.resize(self.world_size_edit)
+
+    def draw_mesher_stats(self):
+        world = self.app.scene.world
+        changed, greedy = imgui.checkbox("Greedy meshing", world.greedy_meshing)
+        if changed:
+            world.set_greedy_meshing(greedy)
+        faces, quads = world.get_mesh_stats()
+        imgui.text(f"Faces: {faces}  Quads: {quads}")
+        if quads:
+            imgui.text(f"Quad reduction: {faces / quads:.2f}x")
+            index_bytes = 0 if SHARED_QUAD_INDICES else 6 * 4
+            vram_kb = quads * (4 * VERTEX_DTYPE.itemsize + index_bytes) / 1024.0
+            imgui.text(f"Mesh memory: {vram_kb:.0f} KB")
+        imgui.text(f"Voxel memory: {world.get_voxel_memory() / 1024.0:.0f} KB")
+        cache = world.mesh_cache.stats()
+        imgui.text(f"Mesh cache: {cache['entries']} meshes, {cache['bytes'] / (1024.0 * 1024.0):.1f} MB, "
+                   f"{cache['hits']} hits / {cache['misses']} misses")
+        pool = buffer_pool.stats()
+        imgui.text(f"GPU buffers: {pool['live_bytes'] / 1024.0:.0f} KB live, {pool['idle_bytes'] / 1024.0:.0f} KB pooled")
+
     def draw_right_panel(self):
         # Separate ImGui window for file/save/history
         imgui.begin("File & History")
@@ -202,9 +240,18 @@ class UIManager:
         imgui.same_line()
         if imgui.button("Load"): self.app.app_load_world()
 
+        # Background file jobs: loads can be cancelled, saves always finish
+        jobs = [(job, verb) for job, verb in ((self.app.load_job, "Loading"), (self.app.save_job, "Saving")) if job]
+        for job, verb in jobs:
+            imgui.text_unformatted(f"{verb} {os.path.basename(job.filepath)}")
+            imgui.progress_bar(job.progress, (imgui.get_window_width() - 90, 0), f"{job.stage} {job.progress:.0%}")
+            if job is self.app.load_job:
+                imgui.same_line()
+                if imgui.button("Cancel"): self.app.app_cancel_load()
+
         imgui.separator(); imgui.text("Recent Files")
         total_h = imgui.get_io().display_size.y
-        imgui.begin_child("HistoryRegion", height=total_h - 120, border=True)
+        imgui.begin_child("HistoryRegion", height=total_h - 120 - 50 * len(jobs), border=True)
         for i, entry in enumerate(list(self.app.history_manager.get_history())):
             filepath = entry.get('path', 'Unknown'); timestamp = entry.get('timestamp')
             time_ago = "(Current)" if filepath == self.app.current_filepath else f"({self.format_time_ago(timestamp)})"
@@ -7,7 +7,7 @@ from OpenGL.GL import (
     glUseProgram, glUniformMatrix4fv, glGetUniformLocation, glDeleteVertexArrays,
     glDeleteBuffers, glDeleteProgram, glEnable, glBlendFunc,
     GL_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_FALSE,
-    GL_LINES, GL_BLEND, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_CULL_FACE
+    GL_TRIANGLES, GL_BLEND, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_CULL_FACE
 )
 import ctypes
 import pyrr
@@ -18,32 +18,17 @@ class Grid:
         program_folder = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + "/"
         self.program = create_shader_program(program_folder + "shaders/grid.vert", program_folder + "shaders/grid.frag")
 
+        # Las seis caras de un cubo unitario; el modelo lo escala al tamaño del
+        # mundo y grid.frag dibuja las líneas de cada celda, así que el coste no
+        # depende del tamaño del mundo (antes había dos líneas por celda y cara).
         vertices = []
-        
-        # --- LÓGICA DE VÉRTICES CORREGIDA Y SIMPLIFICADA ---
-
-        # Dibuja una cuadrícula completa para cada una de las 6 caras del cubo.
-        
-        # Cara Inferior y Superior (Y = 0, Y = height)
-        for y_level in [0, height]:
-            for i in range(width + 1):
-                vertices.extend([i, y_level, 0,   i, y_level, depth]) # Líneas en dirección Z
-            for i in range(depth + 1):
-                vertices.extend([0, y_level, i,   width, y_level, i]) # Líneas en dirección X
-
-        # Cara Izquierda y Derecha (X = 0, X = width)
-        for x_level in [0, width]:
-            for i in range(height + 1):
-                vertices.extend([x_level, i, 0,   x_level, i, depth]) # Líneas en dirección Z
-            for i in range(depth + 1):
-                vertices.extend([x_level, 0, i,   x_level, height, i]) # Líneas en dirección Y
-
-        # Cara Trasera y Frontal (Z = 0, Z = depth)
-        for z_level in [0, depth]:
-            for i in range(height + 1):
-                vertices.extend([0, i, z_level,   width, i, z_level]) # Líneas en dirección X
-            for i in range(width + 1):
-                vertices.extend([i, 0, z_level,   i, height, z_level]) # Líneas en dirección Y
+        for axis in range(3):
+            u, v = (axis + 1) % 3, (axis + 2) % 3
+            for level in (0.0, 1.0):
+                for a, b in ((0, 0), (1, 0), (1, 1), (0, 0), (1, 1), (0, 1)):
+                    corner = [0.0, 0.0, 0.0]
+                    corner[axis], corner[u], corner[v] = level, float(a), float(b)
+                    vertices.extend(corner)
 
         vertices = np.array(vertices, dtype=np.float32)
         self.vertex_count = len(vertices) // 3
@@ -60,7 +45,17 @@ class Grid:
         
         glBindVertexArray(0)
 
-        self.model_matrix = pyrr.matrix44.create_identity(dtype=np.float32)
+        self.size = None
+        self.set_size(width, depth, height)
+
+    def set_size(self, width, depth, height):
+        """ Reescala la cuadrícula (solo cambia la matriz de modelo). """
+        size = (width, height, depth)
+        if size == self.size:
+            return
+        self.size = size
+        self.model_matrix = pyrr.matrix44.create_from_scale([float(width), float(height), float(depth)],
+                                                             dtype=np.float32)
 
     def render(self, projection_matrix, view_matrix):
         if self.program == 0:
@@ -76,7 +71,7 @@ class Grid:
         glUniformMatrix4fv(glGetUniformLocation(self.program, "model"), 1, GL_FALSE, self.model_matrix)
         
         glBindVertexArray(self.vao)
-        glDrawArrays(GL_LINES, 0, self.vertex_count)
+        glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
         
         glDisable(GL_BLEND)
         glEnable(GL_CULL_FACE) # <-- AÑADE ESTA LÍNEA para restaurar el estado
@@ -25,6 +25,67 @@ data_type_vertex = np.dtype([
     # Total por vértice = 32 bytes
 ])
 
+# Layout compacto alternativo (8 bytes por vértice), decodificado en shaders/voxel_packed.vert:
+#   'position':  x | y << 10 | z << 20             (coordenadas locales del chunk, 0..1023)
+#   'attributes': block_id | face << 16 | ao << 19  (block_id < 65536, cara 0..5, índice en Mesher.AO_LEVELS)
+data_type_vertex_packed = np.dtype([
+    ('position',   'u4'),
+    ('attributes', 'u4')
+    # Total por vértice = 8 bytes
+])
+
+# Layout usado para las mallas: 'packed' (8 bytes) o 'float' (32 bytes, el original)
+VERTEX_FORMAT = 'packed'
+VERTEX_DTYPE = data_type_vertex_packed if VERTEX_FORMAT == 'packed' else data_type_vertex
+# Todas las mallas dibujan con un único buffer de índices de quads compartido; el corte
+# de la diagonal por AO se codifica rotando el orden de los vértices del quad
+SHARED_QUAD_INDICES = True
+
+# --- Mundo ---
+# Tamaño por defecto de un documento nuevo: CHUNK_SIZE * WORLD_SIZE_IN_CHUNKS vóxeles por eje.
+# Los chunks se crean solo al escribir el primer vóxel sólido, así que un mundo grande y vacío no ocupa memoria.
+CHUNK_SIZE = 16
+WORLD_SIZE_IN_CHUNKS = 6
+# Límite del control "Chunks per axis" de la UI (64 * 16 = 1024 vóxeles por eje)
+MAX_WORLD_SIZE_IN_CHUNKS = 64
+
+# --- Almacenamiento de vóxeles ---
+# Chunks que se mantienen descomprimidos (uint32) a la vez; el resto se guarda con paleta
+UNPACKED_CHUNK_LIMIT = 64
+# Lado de los bricks de la pirámide de ocupación (vóxel -> brick -> chunk) con la que el
+# raycast salta el espacio vacío; debe dividir CHUNK_SIZE (si no, solo se salta por chunks)
+OCCUPANCY_BRICK_SIZE = 4
+
+# --- Mesher ---
+# 'vectorized' usa src/core/Mesher.py (NumPy); 'legacy' usa el bucle por vóxel
+# de Chunk.build_mesh_legacy. Ambos generan exactamente la misma geometría.
+MESHER_ENGINE = 'vectorized'
+# Fusiona caras coplanares del mismo bloque y AO en rectángulos (solo con el mesher vectorizado)
+GREEDY_MESHING = False
+# Máximo de ediciones por frame que se parchean en sitio antes de reconstruir el chunk entero
+PATCH_EDIT_LIMIT = 32
+# Ediciones masivas: se re-mallan solo las celdas de la caja editada (+1 vóxel por el AO)
+# si ocupa como mucho esta fracción del chunk; si no, el chunk se reconstruye entero
+PATCH_REGION_LIMIT = 0.5
+# Hilos que generan mallas en segundo plano (0 = reconstrucción síncrona en el hilo de GL)
+MESH_WORKERS = 2
+# Procesos para reconstrucciones masivas (cargar/limpiar), con memoria compartida (0 = desactivado)
+PROCESS_MESH_WORKERS = os.cpu_count() or 1
+# Presupuesto en bytes de la caché de mallas por contenido (LRU); 0 la desactiva
+MESH_CACHE_BYTES = 128 * 1024 * 1024
+# Cargas en segundo plano: bytes de bloques con borde que se mallan por lote en el hilo de carga,
+# y bytes de mallas que se suben a la GPU por frame antes de cambiar al mundo cargado
+LOAD_MESH_BATCH_BYTES = 16 * 1024 * 1024
+INSTALL_UPLOAD_BYTES = 16 * 1024 * 1024
+
+# --- Buffers de GPU ---
+# Capacidad mínima de un VBO/EBO del pool; las capacidades crecen en potencias de dos
+GPU_POOL_MIN_BYTES = 4 * 1024
+# Bytes de buffers libres que el pool conserva para reutilizar; el resto se borra
+GPU_POOL_MAX_IDLE_BYTES = 64 * 1024 * 1024
+# Quads que cubre inicialmente el buffer de índices compartido (crece si una malla lo supera)
+QUAD_INDEX_MIN_QUADS = 16 * 1024
+
 
 def create_shader_program(vertex_filepath, fragment_filepath):
     """
@@ -0,0 +1,317 @@
+# src/utils/VlxFormat.py
+"""
+Lectura y escritura de modelos Voxeland, sin depender del mundo ni de la UI.
+
+Two encodings of the same model (voxels, AABB and pivot):
+
+* `.vlx`  - "Voxeland Model Format v1.0", one text line per voxel.
+* `.vlxb` - binary, versioned (VLXB_VERSION). Little-endian layout:
+
+      header      magic b'VLXB', version u16, chunk size u16, index bytes u16,
+                  flags u16 (1 = has pivot, 2 = has AABB), AABB 6 x f64,
+                  pivot 3 x i32, origin 3 x i32, palette size u32, chunk count u32
+      palette     palette size x i32 block ids (index 0 is always air)
+      chunk table chunk count x CHUNK_ENTRY (chunk coords, codec, offset, size)
+      chunk data  per chunk, chunk_size^3 palette indices (u8 or u16, C order
+                  over x, y, z) compressed with the entry's codec
+
+  Each chunk can be read on its own: `VlxbReader` maps the file and only
+  decompresses the chunks asked for.
+
+In both formats coordinates use the file axes: Y and Z are swapped with
+respect to the world (see FileManager). Models are passed around as an
+(N, 4) int64 array of (x, y, z, block_id) rows in file axes.
+
+Conversion between both is lossless for the model content:
+
+    python -m src.utils.VlxFormat model.vlx model.vlxb
+    python -m src.utils.VlxFormat model.vlxb model.vlx
+"""
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+
+import numpy as np
+
+VLX_HEADER = "# Voxeland Model Format v1.0\n"
+
+VLXB_MAGIC = b'VLXB'
+VLXB_VERSION = 1
+VLXB_CHUNK_SIZE = 16
+_HEADER = struct.Struct('<4sHHHH6d3i3iII')
+_HAS_PIVOT, _HAS_AABB = 1, 2
+
+CODEC_RAW, CODEC_ZLIB = 0, 1
+CHUNK_ENTRY = np.dtype([('chunk', '<i4', (3,)), ('codec', '<u4'), ('offset', '<u8'), ('size', '<u8')])
+
+# Whole VOXEL / PIVOT / AABB lines, as the old line-by-line reader accepted them
+VOXEL_LINE = re.compile(r'^[ \t]*VOXEL[ \t]+(\S+[ \t]+\S+[ \t]+\S+[ \t]+\S+)[ \t]*$', re.M)
+PIVOT_LINE = re.compile(r'^[ \t]*PIVOT[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)[ \t]*$', re.M)
+AABB_LINE = re.compile(r'^[ \t]*AABB((?:[ \t]+\S+){6})[ \t]*$', re.M)
+
+# Characters parsed at a time when reading text (bounds the temporary strings)
+READ_BLOCK_CHARS = 8 * 1024 * 1024
+# Rows formatted per write() when saving text; bounds the size of the temporary string
+TEXT_BLOCK_ROWS = 64 * 1024
+
+
+# --- .vlx (texto) ---
+
+def read_vlx(filepath, progress=None):
+    """
+    Parse a .vlx file in bulk, READ_BLOCK_CHARS at a time. Returns (voxels,
+    pivot, aabb): the (N, 4) rows in file axes, the last PIVOT (None if
+    missing or unreadable) and the first AABB line as 6 floats (None if
+    missing). `progress(fraction)` is called after every block.
+    """
+    total = max(os.path.getsize(filepath), 1)
+    parts, pivot, aabb, aabb_seen = [], None, None, False
+    done, tail = 0, ''
+    with open(filepath, 'r') as f:
+        while True:
+            block = f.read(READ_BLOCK_CHARS)
+            text = tail + block
+            if block:
+                # Only whole lines are parsed; the cut one waits for the next block
+                cut = text.rfind('\n') + 1
+                text, tail = text[:cut], text[cut:]
+
+            rows = VOXEL_LINE.findall(text)
+            try:
+                values = np.fromstring(' '.join(rows), dtype=np.int64, sep=' ') if rows else np.zeros(0, dtype=np.int64)
+            except ValueError:
+                values = None
+            if values is None or len(values) != 4 * len(rows):
+                raise ValueError("malformed VOXEL line (expected four integers)")
+            parts.append(values)
+
+            # Like the line reader, the last PIVOT line wins (an unreadable one clears it)
+            pivots = PIVOT_LINE.findall(text)
+            if pivots:
+                try:
+                    pivot = tuple(int(c) for c in pivots[-1])
+                except ValueError:
+                    pivot = None
+
+            match = None if aabb_seen else AABB_LINE.search(text)
+            if match:
+                aabb_seen = True
+                try:
+                    aabb = tuple(float(c) for c in match.group(1).split())
+                except ValueError:
+                    aabb = None
+
+            if not block:
+                break
+            done += len(block)
+            if progress is not None:
+                progress(min(done / total, 1.0))
+    return np.concatenate(parts).reshape(-1, 4), pivot, aabb
+
+
+def write_vlx(filepath, voxels, pivot, aabb):
+    """ Escribe un .vlx; `aabb` None escribe "0 0 0 0 0 0" y `pivot` None "PIVOT 0 0 0". """
+    with open(filepath, 'w', buffering=1024 * 1024) as f:
+        f.write(VLX_HEADER)
+        f.write("AABB {}\n".format(" ".join(str(float(c)) for c in aabb) if aabb is not None else "0 0 0 0 0 0"))
+        # Save pivot information (world-space voxel integer coordinates)
+        px, py, pz = pivot if pivot is not None else (0, 0, 0)
+        f.write(f"PIVOT {int(px)} {int(py)} {int(pz)}\n")
+        f.write("# VOXELS: x y z block_type_id\n")
+        # Large blocks, a single `%` formatting per block of rows
+        rows = np.asarray(voxels, dtype=np.int64).reshape(-1, 4)
+        for start in range(0, len(rows), TEXT_BLOCK_ROWS):
+            block = rows[start:start + TEXT_BLOCK_ROWS]
+            f.write(("VOXEL %d %d %d %d\n" * len(block)) % tuple(block.ravel().tolist()))
+
+
+# --- .vlxb (binario) ---
+
+def write_vlxb(filepath, voxels, pivot, aabb, chunk_size=VLXB_CHUNK_SIZE, codec=CODEC_ZLIB):
+    """
+    Write a .vlxb file. Voxels are grouped in chunk_size^3 blocks of palette
+    indices. Duplicate coordinates keep the last row, as loading does.
+    """
+    rows = np.asarray(voxels, dtype=np.int64).reshape(-1, 4)
+    coords, ids = rows[:, :3], rows[:, 3]
+    palette, indices = np.unique(np.concatenate(([0], ids)), return_inverse=True)
+    indices = indices[1:]
+    if palette[0] != 0:
+        raise ValueError("block ids must not be negative")
+    index_dtype = np.dtype('<u1') if len(palette) <= 256 else np.dtype('<u2')
+    if len(palette) > 65536:
+        raise ValueError(f"Palette too large: {len(palette)} block types")
+
+    origin = coords.min(axis=0) if len(rows) else np.zeros(3, dtype=np.int64)
+    chunk_coords, local = np.divmod(coords - origin, chunk_size)
+    keys, chunk_of = np.unique(chunk_coords, axis=0, return_inverse=True)
+    chunk_of = chunk_of.reshape(-1)
+
+    table = np.zeros(len(keys), dtype=CHUNK_ENTRY)
+    blobs = []
+    offset = _HEADER.size + 4 * len(palette) + CHUNK_ENTRY.itemsize * len(keys)
+    order = np.argsort(chunk_of, kind='stable')
+    starts = np.searchsorted(chunk_of[order], np.arange(len(keys) + 1))
+    for i, key in enumerate(keys):
+        group = order[starts[i]:starts[i + 1]]
+        block = np.zeros((chunk_size,) * 3, dtype=index_dtype)
+        block[tuple(local[group].T)] = indices[group]
+        data = block.tobytes()
+        if codec == CODEC_ZLIB:
+            data = zlib.compress(data, 6)
+        table[i] = (key, codec, offset, len(data))
+        blobs.append(data)
+        offset += len(data)
+
+    flags = (_HAS_PIVOT if pivot is not None else 0) | (_HAS_AABB if aabb is not None else 0)
+    header = _HEADER.pack(VLXB_MAGIC, VLXB_VERSION, chunk_size, index_dtype.itemsize, flags,
+                          *(aabb if aabb is not None else (0.0,) * 6),
+                          *(pivot if pivot is not None else (0, 0, 0)), *(int(c) for c in origin),
+                          len(palette), len(keys))
+    with open(filepath, 'wb') as f:
+        f.write(header)
+        f.write(palette.astype('<i4').tobytes())
+        f.write(table.tobytes())
+        for data in blobs:
+            f.write(data)
+
+
+class VlxbReader:
+    """
+    Acceso a un .vlxb mapeado en memoria: la cabecera, la paleta y la tabla de
+    chunks se leen al abrir; los datos de cada chunk solo al pedirlos.
+    """
+    def __init__(self, filepath):
+        self.file = open(filepath, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.map = b''  # empty file: mmap refuses zero-length maps
+        if len(self.map) < _HEADER.size:
+            self.close()
+            raise ValueError("not a .vlxb file (truncated header)")
+        fields = _HEADER.unpack_from(self.map, 0)
+        magic, self.version, self.chunk_size, index_bytes, flags = fields[:5]
+        if magic != VLXB_MAGIC:
+            self.close()
+            raise ValueError("not a .vlxb file (bad magic)")
+        if self.version > VLXB_VERSION:
+            self.close()
+            raise ValueError(f".vlxb version {self.version} is newer than this reader ({VLXB_VERSION})")
+        self.aabb = tuple(fields[5:11]) if flags & _HAS_AABB else None
+        self.pivot = tuple(fields[11:14]) if flags & _HAS_PIVOT else None
+        self.origin = np.array(fields[14:17], dtype=np.int64)
+        palette_size, chunk_count = fields[17:19]
+        self.index_dtype = np.dtype('<u1') if index_bytes == 1 else np.dtype('<u2')
+        # Small; copied so the map can be closed while they are still in use
+        self.palette = np.frombuffer(self.map, dtype='<i4', count=palette_size, offset=_HEADER.size).astype(np.int64)
+        self.chunks = np.frombuffer(self.map, dtype=CHUNK_ENTRY, count=chunk_count,
+                                    offset=_HEADER.size + 4 * palette_size).copy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def chunk_indices(self, i):
+        """ (chunk_size,)*3 array of palette indices of the i-th chunk of the table. """
+        entry = self.chunks[i]
+        start, size = int(entry['offset']), int(entry['size'])
+        data = self.map[start:start + size]
+        if entry['codec'] == CODEC_ZLIB:
+            data = zlib.decompress(data)
+        elif entry['codec'] != CODEC_RAW:
+            raise ValueError(f"unknown chunk codec {int(entry['codec'])}")
+        return np.frombuffer(data, dtype=self.index_dtype).reshape((self.chunk_size,) * 3)
+
+    def chunk_voxels(self, i):
+        """ (N, 4) rows (file axes) of the non-air voxels of the i-th chunk. """
+        block = self.chunk_indices(i)
+        local = np.argwhere(block)
+        rows = np.empty((len(local), 4), dtype=np.int64)
+        rows[:, :3] = local + self.origin + self.chunks[i]['chunk'].astype(np.int64) * self.chunk_size
+        rows[:, 3] = self.palette[block[tuple(local.T)]]
+        return rows
+
+    def voxels(self, progress=None):
+        """ All the voxels, chunk by chunk in table order; `progress(fraction)` after each chunk. """
+        parts = []
+        for i in range(len(self.chunks)):
+            parts.append(self.chunk_voxels(i))
+            if progress is not None:
+                progress((i + 1) / len(self.chunks))
+        return np.concatenate(parts) if parts else np.zeros((0, 4), dtype=np.int64)
+
+
+def read_vlxb(filepath, progress=None):
+    """ Same result as `read_vlx` for a .vlxb file. """
+    with VlxbReader(filepath) as reader:
+        return reader.voxels(progress), reader.pivot, reader.aabb
+
+
+# --- Ambos ---
+
+def is_binary_path(filepath):
+    return str(filepath).lower().endswith('.vlxb')
+
+
+def read_model(filepath, progress=None):
+    return (read_vlxb if is_binary_path(filepath) else read_vlx)(filepath, progress)
+
+
+def write_model(filepath, voxels, pivot, aabb):
+    """
+    Write the model in the format of the extension. It is written to a
+    temporary file next to `filepath` and moved over it with os.replace, so
+    a crash or error mid-write never leaves a truncated model behind.
+    """
+    writer = write_vlxb if is_binary_path(filepath) else write_vlx
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(filepath) + '.', suffix='.tmp',
+                                     dir=os.path.dirname(os.path.abspath(filepath)))
+    os.close(fd)
+    try:
+        writer(temp_path, voxels, pivot, aabb)
+        with open(temp_path, 'r+b') as f:
+            os.fsync(f.fileno())
+        # mkstemp creates it private; keep the permissions of the file it replaces
+        try:
+            shutil.copymode(filepath, temp_path)
+        except OSError:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def convert(source, target):
+    """ Convierte entre .vlx y .vlxb (según la extensión de cada ruta). """
+    write_model(target, *read_model(source))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python -m src.utils.VlxFormat <input.vlx|.vlxb> <output.vlx|.vlxb>")
+        return 2
+    convert(argv[0], argv[1])
+    print(f"Converted {argv[0]} -> {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())